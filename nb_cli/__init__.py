@@ -1,30 +1,101 @@
+from functools import partial
 from importlib.metadata import EntryPoint, entry_points, version
-
-from cashews import Cache
+import os
+from typing import TYPE_CHECKING, Any
 
 from .i18n import _ as _
+from .profiling import profiled, report, span
 
 try:
     __version__ = version("nb-cli")
 except Exception:
     __version__ = None
 
-cache = Cache("nb")
-cache.setup("mem://")
+if TYPE_CHECKING:
+    from cashews import Cache
+
+    from .cli import cli as cli_sync  # noqa: F401
+    from .cli import run_sync as run_sync
+
+    cache: Cache
+
+
+def __getattr__(name: str) -> Any:
+    # the cli and its dependencies are imported on first use,
+    # so that shell completion can be answered without them
+    if name == "cache":
+        from cashews import Cache
+
+        cache = Cache("nb")
+        cache.setup("mem://")
+        globals()["cache"] = cache
+        return cache
+    if name == "cli_sync":
+        from .cli import cli
+
+        return cli
+    if name == "run_sync":
+        from .cli import run_sync
+
+        return run_sync
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-from .cli import cli as cli_sync
-from .cli import run_sync
-from .consts import PLUGINS_GROUP
-from .handlers import install_signal_handler
+def _plugin_key(entrypoint: EntryPoint) -> tuple[str | None, str]:
+    return (entrypoint.dist.name if entrypoint.dist else None, entrypoint.value)
 
 
+def _install_plugin(entrypoint: EntryPoint) -> None:
+    with span("load_plugin", name=entrypoint.name):
+        entrypoint.load()()  # type: ignore
+
+
+@profiled("load_plugins")
 def load_plugins():
+    """Install the CLI plugins.
+
+    Plugins declaring their commands in the `nb_commands` entry point group
+    are only imported when one of the commands is used.
+    """
+    from .cli import cli
+    from .consts import PLUGIN_COMMANDS_GROUP, PLUGINS_GROUP
+
+    declared: dict[tuple[str | None, str], list[EntryPoint]] = {}
     entrypoint: EntryPoint
+    for entrypoint in entry_points(group=PLUGIN_COMMANDS_GROUP):
+        declared.setdefault(_plugin_key(entrypoint), []).append(entrypoint)
+    for entrypoints in declared.values():
+        cli.add_lazy_plugin(
+            [ep.name for ep in entrypoints], partial(_install_plugin, entrypoints[0])
+        )
+
     for entrypoint in entry_points(group=PLUGINS_GROUP):
-        entrypoint.load()()  # type: ignore
+        if _plugin_key(entrypoint) not in declared:
+            _install_plugin(entrypoint)
 
 
 async def cli_main(*args, **kwargs):
-    install_signal_handler()
-    load_plugins()
-    return await run_sync(cli_sync)(*args, **kwargs)
+    try:
+        with span("cli_main"):
+            with span("import"):
+                from .cli import cli as cli_sync
+                from .cli import run_sync
+                from .completion import COMPLETE_VAR, dump_completion_tree
+                from .handlers import (
+                    close_http_client,
+                    install_signal_handler,
+                    stop_probe_servers,
+                )
+
+            install_signal_handler()
+            load_plugins()
+            if COMPLETE_VAR in os.environ:
+                # completion falls back to click, refresh the tree for the next time
+                dump_completion_tree(cli_sync)
+            try:
+                return await run_sync(cli_sync)(*args, **kwargs)
+            finally:
+                await close_http_client()
+                await stop_probe_servers()
+    finally:
+        report()
@@ -1,11 +1,17 @@
 import sys
 
-import anyio
-
-from . import cli_main
+from .completion import fast_complete
 
 
 def main(*args):
+    # answer shell completion without importing the cli if possible
+    if fast_complete():
+        return
+
+    import anyio
+
+    from . import cli_main
+
     try:
         anyio.run(cli_main, *args)
     except KeyboardInterrupt:
@@ -1,25 +1,38 @@
 from pathlib import Path
-from typing import cast
+from typing import TYPE_CHECKING, Any, cast
 
 import click
-from noneprompt import CancelledError, Choice, ConfirmPrompt, ListPrompt
 
 from nb_cli import _, __version__
-from nb_cli.config import ConfigManager
-from nb_cli.handlers import draw_logo
+from nb_cli.profiling import enable_report, enable_trace
 
+from .bridge import run_async as run_async
+from .bridge import run_sync as run_sync
 from .customize import ClickAliasedCommand as ClickAliasedCommand
 from .customize import ClickAliasedGroup as ClickAliasedGroup
 from .customize import CLIMainGroup as CLIMainGroup
-from .utils import CLI_DEFAULT_STYLE as CLI_DEFAULT_STYLE
-from .utils import run_async as run_async
-from .utils import run_sync as run_sync
+
+if TYPE_CHECKING:
+    from .utils import CLI_DEFAULT_STYLE as CLI_DEFAULT_STYLE
+
+
+def __getattr__(name: str) -> Any:
+    # prompt styles import prompt_toolkit, which is not needed by every command
+    if name == "CLI_DEFAULT_STYLE":
+        from .utils import CLI_DEFAULT_STYLE
+
+        return CLI_DEFAULT_STYLE
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @click.command  # this command only appears in interactive mode.
 @click.pass_context
 @run_async
 async def exit_(ctx: click.Context):
+    from noneprompt import ConfirmPrompt
+
+    from .utils import CLI_DEFAULT_STYLE
+
     if await ConfirmPrompt(_("Are you sure to exit NB CLI?"), True).prompt_async(
         style=CLI_DEFAULT_STYLE
     ):
@@ -35,17 +48,33 @@ def back_():
 def _set_global_working_dir(
     ctx: click.Context, param: click.Option, value: Path | None
 ):
+    from nb_cli.config import ConfigManager
+
     ConfigManager._global_working_dir = value
 
 
 def _set_global_python_path(ctx: click.Context, param: click.Option, value: str | None):
+    from nb_cli.config import ConfigManager
+
     ConfigManager._global_python_path = value
 
 
 def _set_global_use_venv(ctx: click.Context, param: click.Option, value: bool):
+    from nb_cli.config import ConfigManager
+
     ConfigManager._global_use_venv = value
 
 
+def _set_profile(ctx: click.Context, param: click.Option, value: bool):
+    if value:
+        enable_report()
+
+
+def _set_profile_trace(ctx: click.Context, param: click.Option, value: Path | None):
+    if value is not None:
+        enable_trace(value)
+
+
 @click.group(
     cls=CLIMainGroup,
     invoke_without_command=True,
@@ -85,6 +114,24 @@ def _set_global_use_venv(ctx: click.Context, param: click.Option, value: bool):
     expose_value=False,
     callback=_set_global_use_venv,
 )
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help=_("Print the time spent in each phase when exiting."),
+    is_eager=True,
+    expose_value=False,
+    callback=_set_profile,
+)
+@click.option(
+    "--profile-trace",
+    default=None,
+    help=_("Write the time spent in each phase to a Chrome trace file."),
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    is_eager=True,
+    expose_value=False,
+    callback=_set_profile_trace,
+)
 @click.pass_context
 @run_async
 async def cli(ctx: click.Context):
@@ -94,6 +141,12 @@ async def cli(ctx: click.Context):
     if ctx.invoked_subcommand is not None:
         return
 
+    from noneprompt import CancelledError, Choice, ListPrompt
+
+    from nb_cli.handlers import draw_logo
+
+    from .utils import CLI_DEFAULT_STYLE
+
     command = cast(CLIMainGroup, ctx.command)
 
     # auto discover sub commands and scripts
@@ -128,28 +181,19 @@ async def cli(ctx: click.Context):
         await run_sync(ctx.invoke)(sub_cmd)
 
 
-from .commands import (
-    adapter,
-    create,
-    downgrade_format,
-    driver,
-    generate,
-    plugin,
-    run,
-    self,
-    upgrade_format,
-)
+# commands are imported on use, aliases should be kept in sync with them
+cli.add_lazy_command("create", "nb_cli.cli.commands.project:create", aliases=["init"])
+cli.add_lazy_command("run", "nb_cli.cli.commands.project:run", aliases=["start"])
+cli.add_lazy_command("generate", "nb_cli.cli.commands.project:generate")
+cli.add_lazy_command("upgrade-format", "nb_cli.cli.commands.project:upgrade_format")
+cli.add_lazy_command("downgrade-format", "nb_cli.cli.commands.project:downgrade_format")
 
-cli.add_command(create)
-cli.add_command(run)
-cli.add_command(generate)
-cli.add_command(upgrade_format)
-cli.add_command(downgrade_format)
+cli.add_lazy_command("plugin", "nb_cli.cli.commands.plugin:plugin")
 
-cli.add_command(plugin)
+cli.add_lazy_command("adapter", "nb_cli.cli.commands.adapter:adapter")
 
-cli.add_command(adapter)
+cli.add_lazy_command("driver", "nb_cli.cli.commands.driver:driver")
 
-cli.add_command(driver)
+cli.add_lazy_command("workspace", "nb_cli.cli.commands.workspace:workspace")
 
-cli.add_command(self)
+cli.add_lazy_command("self", "nb_cli.cli.commands.self:self")
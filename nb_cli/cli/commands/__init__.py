@@ -1,9 +1,36 @@
-from .adapter import adapter as adapter
-from .driver import driver as driver
-from .plugin import plugin as plugin
-from .project import create as create
-from .project import downgrade_format as downgrade_format
-from .project import generate as generate
-from .project import run as run
-from .project import upgrade_format as upgrade_format
-from .self import self as self
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .adapter import adapter as adapter
+    from .driver import driver as driver
+    from .plugin import plugin as plugin
+    from .project import create as create
+    from .project import downgrade_format as downgrade_format
+    from .project import generate as generate
+    from .project import run as run
+    from .project import upgrade_format as upgrade_format
+    from .self import self as self
+    from .workspace import workspace as workspace
+
+_LAZY_ATTRS: dict[str, str] = {
+    "adapter": "adapter",
+    "driver": "driver",
+    "plugin": "plugin",
+    "create": "project",
+    "downgrade_format": "project",
+    "generate": "project",
+    "run": "project",
+    "upgrade_format": "project",
+    "self": "self",
+    "workspace": "workspace",
+}
+
+
+def __getattr__(name: str) -> Any:
+    # commands are imported on use, see `ClickAliasedGroup.add_lazy_command`
+    if (module := _LAZY_ATTRS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
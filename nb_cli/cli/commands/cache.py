@@ -1,3 +1,4 @@
+import contextlib
 import os
 from pathlib import Path
 from typing import Literal, cast
@@ -16,7 +17,8 @@ from nb_cli.cli import (
     run_sync,
 )
 from nb_cli.cli.utils import humanize_data_size
-from nb_cli.handlers import download_module_data
+from nb_cli.exceptions import ModuleLoadFailed
+from nb_cli.handlers import load_module_data_batch
 from nb_cli.handlers.data import CACHE_DIR
 
 
@@ -167,10 +169,8 @@ async def status(si: bool = False):
     )
 
 
-async def _update_module_data(module_type: Literal["adapter", "plugin", "driver"]):
-    try:
-        await download_module_data(module_type)
-    except Exception:
+def _report_update(module_type: str, exception: Exception | None) -> None:
+    if exception is not None:
         click.secho(
             _("ERROR: Failed to update data cache for module {module_type}.").format(
                 module_type=module_type
@@ -185,14 +185,22 @@ async def _update_module_data(module_type: Literal["adapter", "plugin", "driver"
         )
 
 
+async def _update_module_data(
+    *module_types: Literal["adapter", "plugin", "driver"],
+) -> None:
+    with contextlib.suppress(ModuleLoadFailed):  # reported by callback
+        await load_module_data_batch(
+            *module_types, refresh=True, callback=_report_update
+        )
+
+
 @cache.command(name="update", help=_("Update local cache."))
 @click.argument("module_type", type=str, nargs=1, default="all")
 @run_async
 async def update(module_type: str):
     await cache_data.clear()
     if module_type == "all":
-        for mod in "adapter", "plugin", "driver":
-            await _update_module_data(mod)
+        await _update_module_data("adapter", "plugin", "driver")
         return
 
     if module_type not in ("adapter", "plugin", "driver"):
@@ -287,6 +295,21 @@ async def clear(unpublished_only: bool = False, noconfirm: bool = False):
         CACHE_DIR / "adapters.json",
         CACHE_DIR / "drivers.json",
         CACHE_DIR / "plugins.json",
+        CACHE_DIR / "adapters_validators.json",
+        CACHE_DIR / "drivers_validators.json",
+        CACHE_DIR / "plugins_validators.json",
+        CACHE_DIR / "adapters.snapshot",
+        CACHE_DIR / "drivers.snapshot",
+        CACHE_DIR / "plugins.snapshot",
+        CACHE_DIR / "adapters.index",
+        CACHE_DIR / "drivers.index",
+        CACHE_DIR / "plugins.index",
+        CACHE_DIR / "adapters.names",
+        CACHE_DIR / "drivers.names",
+        CACHE_DIR / "plugins.names",
+        CACHE_DIR / "completion.json",
+        CACHE_DIR / "mirrors.json",
+        CACHE_DIR / "interpreters.json",
     ):
         if f.is_file():
             await run_sync(os.remove)(f)
@@ -14,6 +14,7 @@ from nb_cli.cli import (
     run_sync,
 )
 from nb_cli.cli.utils import find_exact_package, format_package_results
+from nb_cli.completion import package_name_completer
 from nb_cli.exceptions import ProcessExecutionError
 from nb_cli.handlers import EnvironmentExecutor, list_drivers
 
@@ -122,7 +123,12 @@ async def search(name: str | None, include_unpublished: bool = False):
     flag_value=True,
     help=_("Whether to include unpublished drivers."),
 )
-@click.argument("name", nargs=1, default=None)
+@click.argument(
+    "name",
+    nargs=1,
+    default=None,
+    shell_complete=package_name_completer("driver"),
+)
 @click.argument("pip_args", nargs=-1, default=None)
 @run_async
 async def install(
@@ -175,7 +181,12 @@ async def install(
     flag_value=True,
     help=_("Whether to include unpublished drivers."),
 )
-@click.argument("name", nargs=1, default=None)
+@click.argument(
+    "name",
+    nargs=1,
+    default=None,
+    shell_complete=package_name_completer("driver"),
+)
 @click.argument("pip_args", nargs=-1, default=None)
 @run_async
 async def update(
@@ -222,7 +233,12 @@ async def update(
     context_settings={"ignore_unknown_options": True},
     help=_("Uninstall nonebot driver from current project."),
 )
-@click.argument("name", nargs=1, default=None)
+@click.argument(
+    "name",
+    nargs=1,
+    default=None,
+    shell_complete=package_name_completer("driver"),
+)
 @click.argument("pip_args", nargs=-1, default=None)
 @run_async
 async def uninstall(name: str | None, pip_args: list[str] | None):
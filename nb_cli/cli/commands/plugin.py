@@ -16,10 +16,16 @@ from nb_cli.cli import (
 )
 from nb_cli.cli.utils import find_exact_package, format_package_results
 from nb_cli.config import GLOBAL_CONFIG
-from nb_cli.exceptions import NoSelectablePackageError, ProcessExecutionError
+from nb_cli.completion import package_name_completer
+from nb_cli.exceptions import (
+    NoSelectablePackageError,
+    ProcessExecutionError,
+    PythonInterpreterError,
+)
 from nb_cli.handlers import (
     EnvironmentExecutor,
     create_plugin,
+    get_package_install_states,
     list_installed_plugins,
     list_plugins,
 )
@@ -102,9 +108,17 @@ async def list_(installed: bool = False, include_unpublished: bool = False):
         if installed
         else await list_plugins(include_unpublished=include_unpublished)
     )
+    install_states = None
+    if installed:
+        try:
+            install_states = await get_package_install_states(plugins)
+        except PythonInterpreterError:
+            click.secho(
+                _("WARNING: Failed to check install states of plugins."), fg="yellow"
+            )
     if include_unpublished:
         click.secho(_("WARNING: Unpublished plugins may be included."), fg="yellow")
-    click.echo(format_package_results(plugins))
+    click.echo(format_package_results(plugins, install_states=install_states))
 
 
 @plugin.command(help=_("Search for nonebot plugins published on nonebot homepage."))
@@ -143,7 +157,13 @@ async def search(name: str | None, include_unpublished: bool = False):
     flag_value=True,
     help=_("Whether to include unpublished plugins."),
 )
-@click.argument("name", nargs=1, required=False, default=None)
+@click.argument(
+    "name",
+    nargs=1,
+    required=False,
+    default=None,
+    shell_complete=package_name_completer("plugin"),
+)
 @click.argument("pip_args", nargs=-1, default=None)
 @click.pass_context
 @run_async
@@ -258,7 +278,13 @@ async def install(
     flag_value=True,
     help=_("Whether to include unpublished plugins."),
 )
-@click.argument("name", nargs=1, required=False, default=None)
+@click.argument(
+    "name",
+    nargs=1,
+    required=False,
+    default=None,
+    shell_complete=package_name_completer("plugin"),
+)
 @click.argument("pip_args", nargs=-1, default=None)
 @run_async
 async def update(
@@ -305,7 +331,13 @@ async def update(
     context_settings={"ignore_unknown_options": True},
     help=_("Uninstall nonebot plugin from current project."),
 )
-@click.argument("name", nargs=1, required=False, default=None)
+@click.argument(
+    "name",
+    nargs=1,
+    required=False,
+    default=None,
+    shell_complete=package_name_completer("plugin"),
+)
 @click.argument("pip_args", nargs=-1, default=None)
 @run_async
 async def uninstall(name: str | None, pip_args: list[str] | None):
@@ -39,11 +39,10 @@ from nb_cli.handlers import (
     downgrade_project_format,
     generate_run_script,
     get_project_root,
-    list_adapters,
     list_builtin_plugins,
-    list_drivers,
     list_plugins,
     list_project_templates,
+    load_module_data_batch,
     run_project,
     terminate_process,
     upgrade_project_format,
@@ -107,9 +106,10 @@ def project_devtools_validator(devtools: tuple[Choice[str], ...]) -> bool:
 
 async def prompt_common_context(context: ProjectContext) -> ProjectContext:
     click.secho(_("Loading adapters..."))
-    all_adapters = await list_adapters()
     click.secho(_("Loading drivers..."))
-    all_drivers = await list_drivers()
+    module_data = await load_module_data_batch("adapter", "driver")
+    all_adapters = module_data["adapter"]
+    all_drivers = module_data["driver"]
 
     project_name = await InputPrompt(
         _("Project Name:"),
@@ -442,8 +442,9 @@ async def create(
                 ).prompt_async(style=CLI_DEFAULT_STYLE)
             ]
             try:
-                for plugin in loaded_builtin_plugins:
-                    config_manager.add_builtin_plugin(plugin)
+                with config_manager.transaction():
+                    for plugin in loaded_builtin_plugins:
+                        config_manager.add_builtin_plugin(plugin)
             except Exception as e:
                 click.secho(
                     _(
@@ -0,0 +1,338 @@
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+import subprocess
+import tempfile
+from typing import IO, Any
+
+import click
+from noneprompt import CancelledError
+
+from nb_cli import _
+from nb_cli.cli import ClickAliasedGroup, run_async
+from nb_cli.cli.utils import find_exact_package, format_package_results
+from nb_cli.completion import package_name_completer
+from nb_cli.config import GLOBAL_CONFIG, ConfigManager, Plugin
+from nb_cli.exceptions import (
+    NoSelectablePackageError,
+    ProcessExecutionError,
+    ProjectNotFoundError,
+    PythonInterpreterError,
+)
+from nb_cli.handlers import (
+    EnvironmentExecutor,
+    get_package_install_states,
+    list_installed_plugins,
+    list_plugins,
+    load_module_data,
+)
+from nb_cli.handlers.registry import RegistryView
+from nb_cli.handlers.store import load_unpublished_modules
+from nb_cli.handlers.workspace import (
+    DEFAULT_JOBS,
+    ProjectResult,
+    discover_projects,
+    find_workspace_file,
+    load_workspace_file,
+    run_in_projects,
+)
+
+_LOG_TAIL_LINES = 20
+
+
+@dataclass
+class _Workspace:
+    workspace_file: Path | None
+    patterns: tuple[str, ...]
+    jobs: int
+
+    def get_projects(self) -> list[Path]:
+        base = GLOBAL_CONFIG.working_dir
+        patterns = list(self.patterns)
+        if self.workspace_file is not None or not patterns:
+            if (file := self.workspace_file or find_workspace_file(base)) is None:
+                raise click.UsageError(
+                    _(
+                        "No workspace file found. "
+                        "Use --file or --projects to select projects."
+                    )
+                )
+            try:
+                patterns.extend(load_workspace_file(file))
+            except (OSError, ValueError) as e:
+                raise click.UsageError(str(e)) from e
+        try:
+            return discover_projects(patterns, base)
+        except ProjectNotFoundError as e:
+            raise click.UsageError(str(e)) from e
+
+    async def run(
+        self, func: Callable[[Path], Awaitable[Any]]
+    ) -> list[ProjectResult[Any]]:
+        projects = self.get_projects()
+        click.echo(
+            _("Running in {count} project(s) with {jobs} job(s)...").format(
+                count=len(projects), jobs=self.jobs
+            )
+        )
+        return await run_in_projects(projects, func, jobs=self.jobs)
+
+
+async def _load_registry() -> RegistryView[Plugin]:
+    # loaded once and shared, so that projects do not each load the registry
+    return await load_module_data("plugin") + await load_unpublished_modules(Plugin)
+
+
+def _read_tail(log: IO[bytes]) -> str:
+    log.seek(0)
+    lines = log.read().decode(errors="replace").splitlines()
+    return "\n".join(lines[-_LOG_TAIL_LINES:])
+
+
+async def _get_executor(
+    project: Path, manager: ConfigManager, log: IO[bytes]
+) -> EnvironmentExecutor:
+    # outputs of concurrent installs would interleave, keep them per project
+    return await EnvironmentExecutor.get(
+        toml_manager=manager,
+        cwd=project,
+        stdin=subprocess.DEVNULL,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+
+
+def _is_installed(plugin: Plugin, installed: Sequence[Plugin]) -> bool:
+    return any(
+        (p.project_link, p.module_name) == (plugin.project_link, plugin.module_name)
+        for p in installed
+    )
+
+
+def _echo_summary(results: list[ProjectResult[tuple[bool, str]]]) -> bool:
+    """Print the outcome of every project, and return whether all succeeded."""
+    click.echo(_("Summary:"))
+    for r in results:
+        if r.error is not None:
+            click.secho(f"  ✘ {r.project}: {r.error}", fg="red")
+        elif r.result is not None:
+            changed, message = r.result
+            click.secho(
+                f"  {'✔' if changed else '-'} {r.project}: {message}",
+                fg="green" if changed else "yellow",
+            )
+    return all(r.error is None for r in results)
+
+
+async def _find_plugin(
+    question: str, name: str | None, include_unpublished: bool
+) -> Plugin | None:
+    try:
+        return await find_exact_package(
+            question, name, await list_plugins(include_unpublished=include_unpublished)
+        )
+    except CancelledError:
+        return None
+    except NoSelectablePackageError:
+        click.echo(_("No available plugin found."))
+        return None
+    except RuntimeError:  # reported by find_exact_package
+        return None
+
+
+@click.group(
+    cls=ClickAliasedGroup, help=_("Manage multiple projects of a workspace at once.")
+)
+@click.option(
+    "-f",
+    "--file",
+    "workspace_file",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help=_("Workspace file listing the project globs."),
+)
+@click.option(
+    "-p",
+    "--projects",
+    "patterns",
+    multiple=True,
+    help=_("Glob of project directories, can be used multiple times."),
+)
+@click.option(
+    "-j",
+    "--jobs",
+    default=DEFAULT_JOBS,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help=_("Maximum number of projects processed at the same time."),
+)
+@click.pass_context
+def workspace(
+    ctx: click.Context,
+    workspace_file: Path | None,
+    patterns: tuple[str, ...],
+    jobs: int,
+):
+    # projects are discovered by the subcommands, so that help works anywhere
+    ctx.obj = _Workspace(workspace_file, patterns, jobs)
+
+
+@workspace.command(name="list", help=_("List projects of the workspace."))
+@click.pass_obj
+def list_(ws: _Workspace):
+    for project in ws.get_projects():
+        click.echo(str(project))
+
+
+@workspace.group(
+    cls=ClickAliasedGroup, help=_("Manage bot plugins of all workspace projects.")
+)
+def plugin():
+    pass
+
+
+@plugin.command(name="list", help=_("List installed plugins of each project."))
+@click.pass_obj
+@run_async
+async def plugin_list(ws: _Workspace):
+    registry = await _load_registry()
+
+    async def _list(project: Path) -> str:
+        plugins = await list_installed_plugins(cwd=project, registry=registry)
+        install_states = None
+        try:
+            install_states = await get_package_install_states(plugins, cwd=project)
+        except PythonInterpreterError:
+            click.secho(
+                _(
+                    "WARNING: Failed to check install states of plugins in {project}."
+                ).format(project=project),
+                fg="yellow",
+            )
+        return format_package_results(plugins, install_states=install_states)
+
+    results = await ws.run(_list)
+    for r in results:
+        click.secho(f"\n{r.project}", bold=True)
+        if r.error is not None:
+            click.secho(str(r.error), fg="red")
+        else:
+            click.echo(r.result)
+
+
+@plugin.command(
+    context_settings={"ignore_unknown_options": True},
+    help=_("Install nonebot plugin to all workspace projects."),
+)
+@click.option(
+    "--no-restrict-version", nargs=1, is_flag=True, flag_value=True, default=False
+)
+@click.option(
+    "--include-unpublished",
+    is_flag=True,
+    default=False,
+    flag_value=True,
+    help=_("Whether to include unpublished plugins."),
+)
+@click.argument(
+    "name",
+    nargs=1,
+    required=False,
+    default=None,
+    shell_complete=package_name_completer("plugin"),
+)
+@click.argument("pip_args", nargs=-1, default=None)
+@click.pass_context
+@run_async
+async def install(
+    ctx: click.Context,
+    no_restrict_version: bool,
+    name: str | None,
+    pip_args: list[str] | None,
+    include_unpublished: bool = False,
+):
+    extras: str | None = None
+    if name and "[" in name:
+        name, extras = name.split("[", 1)
+        extras = extras.rstrip("]")
+
+    plugin = await _find_plugin(_("Plugin name to install:"), name, include_unpublished)
+    if plugin is None:
+        return
+    requirement = plugin.as_requirement(
+        extras=extras, versioned=not no_restrict_version
+    )
+
+    registry = await _load_registry()
+
+    async def _install(project: Path) -> tuple[bool, str]:
+        installed = await list_installed_plugins(cwd=project, registry=registry)
+        if _is_installed(plugin, installed):
+            return False, _("Already installed.")
+
+        manager = ConfigManager(working_dir=project)
+        with tempfile.TemporaryFile() as log:
+            executor = await _get_executor(project, manager, log)
+            try:
+                await executor.install(requirement, extra_args=pip_args or ())
+            except ProcessExecutionError as e:
+                raise ProcessExecutionError(f"{e}\n{_read_tail(log)}") from e
+        manager.add_plugin(plugin)
+        return True, _("Installed {requirement}.").format(requirement=requirement)
+
+    if not _echo_summary(await ctx.obj.run(_install)):
+        ctx.exit(1)
+
+
+@plugin.command(
+    context_settings={"ignore_unknown_options": True},
+    help=_("Update nonebot plugin in all workspace projects."),
+)
+@click.option(
+    "--include-unpublished",
+    is_flag=True,
+    default=False,
+    flag_value=True,
+    help=_("Whether to include unpublished plugins."),
+)
+@click.argument(
+    "name",
+    nargs=1,
+    required=False,
+    default=None,
+    shell_complete=package_name_completer("plugin"),
+)
+@click.argument("pip_args", nargs=-1, default=None)
+@click.pass_context
+@run_async
+async def update(
+    ctx: click.Context,
+    name: str | None,
+    pip_args: list[str] | None,
+    include_unpublished: bool = False,
+):
+    plugin = await _find_plugin(_("Plugin name to update:"), name, include_unpublished)
+    if plugin is None:
+        return
+
+    registry = await _load_registry()
+
+    async def _update(project: Path) -> tuple[bool, str]:
+        installed = await list_installed_plugins(cwd=project, registry=registry)
+        if not _is_installed(plugin, installed):
+            return False, _("Not installed.")
+
+        with tempfile.TemporaryFile() as log:
+            executor = await _get_executor(
+                project, ConfigManager(working_dir=project), log
+            )
+            try:
+                await executor.update(
+                    plugin.as_requirement(), extra_args=pip_args or ()
+                )
+            except ProcessExecutionError as e:
+                raise ProcessExecutionError(f"{e}\n{_read_tail(log)}") from e
+        return True, _("Updated {name}.").format(name=plugin.project_link)
+
+    if not _echo_summary(await ctx.obj.run(_update)):
+        ctx.exit(1)
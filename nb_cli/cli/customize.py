@@ -1,13 +1,15 @@
 from collections import Counter
+from collections.abc import Callable, Iterable
 from functools import partial
+from importlib import import_module
+from typing import Any
 
 import click
 
 from nb_cli import _, cache
 from nb_cli.exceptions import ProjectNotFoundError
-from nb_cli.handlers import list_scripts, run_script
 
-from .utils import run_async
+from .bridge import run_async
 
 
 class ClickAliasedCommand(click.Command):
@@ -22,6 +24,8 @@ class ClickAliasedGroup(click.Group):
         super().__init__(*args, **kwargs)
         self._commands: dict[str, list[str]] = {}
         self._aliases: dict[str, str] = {}
+        self._lazy_commands: dict[str, str | Callable[[], Any]] = {}
+        self._shadowed_commands: dict[str, str | Callable[[], Any]] = {}
 
     def command(  # pyright: ignore[reportIncompatibleMethodOverride]
         self, *args, **kwargs
@@ -59,13 +63,63 @@ class ClickAliasedGroup(click.Group):
             self.add_aliases(cmd.name, aliases)
         return super().add_command(cmd, name=name)
 
+    def add_lazy_command(
+        self, name: str, import_path: str, aliases: list[str] | None = None
+    ) -> None:
+        """Register a command which is imported when it is used.
+
+        Args:
+            name: Name of the command.
+            import_path: `module:attribute` path of the command object.
+            aliases: Aliases of the command, which are unknown until it is
+                imported.
+        """
+        self._lazy_commands[name] = import_path
+        if aliases:
+            self.add_aliases(name, aliases)
+
+    def add_lazy_plugin(
+        self, cmd_names: Iterable[str], install: Callable[[], Any]
+    ) -> None:
+        """Register commands which are added by a plugin when one of them is used.
+
+        A lazy command of the same name is loaded right before the plugin, so
+        that the plugin overrides it like when plugins are installed eagerly.
+
+        Args:
+            cmd_names: Names of the commands declared by the plugin.
+            install: Function adding the commands, called at most once.
+        """
+        for cmd_name in cmd_names:
+            if (previous := self._lazy_commands.get(cmd_name)) is not None:
+                self._shadowed_commands[cmd_name] = previous
+            self._lazy_commands[cmd_name] = install
+
+    def _load_lazy_command(self, cmd_name: str) -> None:
+        if (target := self._lazy_commands.pop(cmd_name, None)) is None:
+            return
+        if isinstance(target, str):
+            module, __, attr = target.partition(":")
+            self.add_command(getattr(import_module(module), attr), cmd_name)
+            return
+        # the plugin adds all of its commands at once
+        names = [name for name, t in self._lazy_commands.items() if t is target]
+        for name in names:
+            del self._lazy_commands[name]
+        for name in (cmd_name, *names):
+            if (previous := self._shadowed_commands.pop(name, None)) is not None:
+                self._lazy_commands[name] = previous
+                self._load_lazy_command(name)
+        target()
+
     def get_command(self, ctx: click.Context, cmd_name: str):
         cmd_name = self.resolve_alias(cmd_name)
+        self._load_lazy_command(cmd_name)
         if command := super().get_command(ctx, cmd_name):
             return command
 
     def list_commands(self, ctx: click.Context) -> list[str]:
-        return list(self.commands.keys())
+        return list(dict.fromkeys([*self.commands, *self._lazy_commands]))
 
     def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter):
         rows = []
@@ -101,6 +155,8 @@ class CLIMainGroup(ClickAliasedGroup):
     @staticmethod
     @run_async
     async def _run_script_command(script_name: str, script_args: list[str]):
+        from nb_cli.handlers import run_script
+
         proc = await run_script(script_name, script_args)
         await proc.wait()
 
@@ -122,6 +178,8 @@ class CLIMainGroup(ClickAliasedGroup):
     @run_async  # type: ignore
     @cache(ttl=None)
     async def _load_scripts(self, ctx: click.Context) -> list[click.Command]:
+        from nb_cli.handlers import list_scripts
+
         try:
             scripts = await list_scripts()
         except ProjectNotFoundError:
@@ -1,12 +1,15 @@
-from collections.abc import Callable, Coroutine, Iterable
-from functools import partial, wraps
+from collections.abc import (
+    Callable,
+    Collection,
+    Iterable,
+    Mapping,
+    Sequence,
+)
+from functools import lru_cache
 import shutil
 from statistics import median_high
-from typing import Any, Literal, Protocol, TypeVar
-from typing_extensions import ParamSpec
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple, Protocol, TypeVar
 
-import anyio.from_thread
-import anyio.to_thread
 import click
 from noneprompt import Choice, ListPrompt
 from prompt_toolkit.styles import Style
@@ -15,10 +18,15 @@ from wcwidth import wcswidth
 from nb_cli import _
 from nb_cli.config import Adapter, Driver, Plugin
 from nb_cli.exceptions import NoSelectablePackageError
+from nb_cli.handlers.registry import AUTHOR_INDEX, TAG_INDEX, TEXT_INDEX, RegistryView
+
+from .bridge import run_async as run_async
+from .bridge import run_sync as run_sync
+
+if TYPE_CHECKING:
+    from nb_cli.handlers.meta import InstalledDistribution
 
 T = TypeVar("T", Adapter, Plugin, Driver)
-P = ParamSpec("P")
-R = TypeVar("R")
 CT = TypeVar("CT", bound=str)
 
 CLI_DEFAULT_STYLE = Style.from_dict(
@@ -62,10 +70,71 @@ ADVANCED_SEARCH_FILTERS_ARGS: dict[str, _ValueFilterFunction] = {
 }
 
 
+class _IndexedFilterFunction(Protocol):
+    def __call__(self, view: RegistryView[Any], *, value: str) -> Collection[int]: ...
+
+
+def _plugin_passing_positions(view: RegistryView[Any]) -> Collection[int]:
+    if not issubclass(view.module_class, Plugin):
+        return range(len(view))
+    return [
+        i
+        for i, (valid, skip_test) in enumerate(
+            zip(view.column("valid"), view.column("skip_test"))
+        )
+        if valid is True or skip_test is True
+    ]
+
+
+def _plugin_type_positions(view: RegistryView[Any], *, value: str) -> Collection[int]:
+    if (
+        not value.strip()
+        or not issubclass(view.module_class, Plugin)
+        or value.strip() in "unknown"
+    ):
+        return range(len(view))
+    return [
+        i
+        for i, type_ in enumerate(view.column("type"))
+        if type_ is not None and value.strip() in type_
+    ]
+
+
+# same as the filters above, but evaluated on the indexes of a registry view
+ADVANCED_SEARCH_INDEXED_FILTERS_SIMPLE: dict[
+    str, Callable[[RegistryView[Any]], Collection[int]]
+] = {
+    "official": lambda view: [
+        i for i, official in enumerate(view.column("is_official")) if official is True
+    ],
+    "passing": _plugin_passing_positions,
+}
+ADVANCED_SEARCH_INDEXED_FILTERS_ARGS: dict[str, _IndexedFilterFunction] = {
+    "author:": lambda view, *, value: (
+        range(len(view))
+        if not value.strip()
+        else set().union(
+            *(view.search_positions(v, AUTHOR_INDEX) for v in value.strip().split(","))
+        )
+    ),
+    "tag:": lambda view, *, value: (
+        range(len(view))
+        if not value.strip()
+        else set().union(
+            *(
+                view.lookup_positions(TAG_INDEX, v.lower())
+                for v in value.strip().split(",")
+            )
+        )
+    ),
+    "type:": _plugin_type_positions,
+}
+
+
 async def find_exact_package(
     question: str,
     name: str | None,
-    packages: list[T],
+    packages: Sequence[T],
     *,
     no_extras: bool = False,
     echo: bool = True,
@@ -85,23 +154,33 @@ async def find_exact_package(
                     )
                     for p in packages
                 ],
-                custom_filter=lambda input_, p: advanced_search_filter(input_, p.data),
+                custom_filter=advanced_search_choice_filter(packages),
             ).prompt_async(style=CLI_DEFAULT_STYLE)
         ).data
 
     if not no_extras and "[" in name:
         name = name.split("[", 1)[0].strip()
 
-    if exact_packages := [
-        p for p in packages if name in {p.name, p.module_name, p.project_link}
-    ]:
+    if isinstance(packages, RegistryView):
+        # indexed lookups do not build models of the whole registry
+        exact_packages = packages.lookup_any(
+            ("name", "module_name", "project_link"), name
+        )
+    else:
+        exact_packages = [
+            p for p in packages if name in {p.name, p.module_name, p.project_link}
+        ]
+    if exact_packages:
         return exact_packages[0]
 
-    packages = [
-        p
-        for p in packages
-        if name in p.name or name in p.module_name or name in p.project_link
-    ]
+    if isinstance(packages, RegistryView):
+        packages = packages.search(name)
+    else:
+        packages = [
+            p
+            for p in packages
+            if name in p.name or name in p.module_name or name in p.project_link
+        ]
     if len(packages) == 1:
         return packages[0]
     elif echo and len(packages) > 1:
@@ -115,22 +194,6 @@ async def find_exact_package(
     raise RuntimeError("No or multiple packages found.")
 
 
-def run_sync(func: Callable[P, R]) -> Callable[P, Coroutine[Any, Any, R]]:
-    @wraps(func)
-    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-        return await anyio.to_thread.run_sync(partial(func, *args, **kwargs))
-
-    return wrapper
-
-
-def run_async(func: Callable[P, Coroutine[Any, Any, R]]) -> Callable[P, R]:
-    @wraps(func)
-    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-        return anyio.from_thread.run(partial(func, *args, **kwargs))
-
-    return wrapper
-
-
 def humanize_data_size(
     bytes_: int,
     *,
@@ -195,17 +258,33 @@ def split_text_by_wcswidth(text: str, width: int):
     return text[:_width], text[_width:]
 
 
+def _format_install_state(state: "InstalledDistribution | None") -> str:
+    if state is None or state["version"] is None:
+        return _("not installed")
+    if not state["satisfied"]:
+        return _("{version} unsatisfied").format(version=state["version"])
+    return state["version"]
+
+
 def format_package_results(
-    hits: list[T],
+    hits: Sequence[T],
     name_column_width: int | None = None,
     terminal_width: int | None = None,
+    install_states: "Mapping[str, InstalledDistribution] | None" = None,
 ) -> str:
     if not hits:
         return ""
 
+    links = [f"({hit.project_link})" for hit in hits]
+    if install_states is not None:
+        links = [
+            f"({hit.project_link} "
+            f"{_format_install_state(install_states.get(hit.project_link))})"
+            for hit in hits
+        ]
     if name_column_width is None:
         name_column_width = median_high(
-            wcswidth(f"{hit.name} ({hit.project_link})") for hit in hits
+            wcswidth(f"{hit.name} {link}") for hit, link in zip(hits, links)
         )
     if terminal_width is None:
         terminal_width = shutil.get_terminal_size()[0]
@@ -213,13 +292,12 @@ def format_package_results(
     desc_width = terminal_width - name_column_width - 8
 
     lines: list[str] = []
-    for hit in hits:
+    for hit, link in zip(hits, links):
         is_official = "👍" if hit.is_official else "  "
         valid = "  "
         if isinstance(hit, Plugin):
             valid = "✅" if hit.valid else "❌"
         name = hit.name.replace("\n", "")
-        link = f"({hit.project_link})"
         desc = hit.desc.replace("\n", "")
         # wrap and indent summary to fit terminal
         is_first_line = True
@@ -280,17 +358,57 @@ def auto_fgcolor(
     return dark if luminance > (0.5**gamma) else light
 
 
-def _advanced_search_filter(input_: str | list[str]) -> Callable[[T], bool]:
+class _AdvancedSearchQuery(NamedTuple):
+    filters: list[tuple[str, str | None]]
+    nfilters: list[tuple[str, str | None]]
+    words: set[str]
+    nwords: set[str]
+
+
+def _parse_advanced_search(input_: str | list[str]) -> list[_AdvancedSearchQuery]:
+    """Parse an advanced search into alternative queries (separated by `;`)."""
     if isinstance(input_, str):
         if ";" in input_[:1024]:
-            return lambda module: any(
-                _advanced_search_filter(_strip)(module)
+            return [
+                query
                 for sep in input_.split(";")
                 if (_strip := sep.strip())
-            )
+                for query in _parse_advanced_search(_strip)
+            ]
         input_ = input_.split()
 
-    def keyword_filter(m: T) -> bool:
+    query = _AdvancedSearchQuery([], [], set(), set())
+    for word in input_:
+        if word and word[0] not in "#!":
+            if word[0] != "-":
+                query.words.add(word)
+            elif word[1:]:
+                query.nwords.add(word[1:])
+            continue
+        _filt = query.filters if word[0] == "#" else query.nfilters
+        for stag in ADVANCED_SEARCH_FILTERS_SIMPLE:
+            if word[1:] == stag:
+                _filt.append((stag, None))
+        for atag in ADVANCED_SEARCH_FILTERS_ARGS:
+            if word[1:].startswith(atag):
+                _filt.append((atag, word[1:].removeprefix(atag)))
+    return [query]
+
+
+def _apply_filter(tag: str, value: str | None, module: T) -> bool:
+    if value is None:
+        return ADVANCED_SEARCH_FILTERS_SIMPLE[tag](module)
+    return ADVANCED_SEARCH_FILTERS_ARGS[tag](module, value=value)
+
+
+def _advanced_search_filter(input_: str | list[str]) -> Callable[[T], bool]:
+    queries = _parse_advanced_search(input_)
+
+    def query_filter(query: _AdvancedSearchQuery, m: T) -> bool:
+        if not all(_apply_filter(tag, value, m) for tag, value in query.filters):
+            return False
+        if any(_apply_filter(tag, value, m) for tag, value in query.nfilters):
+            return False
         search_src = (
             m.project_link.lower(),
             m.module_name.lower(),
@@ -298,51 +416,86 @@ def _advanced_search_filter(input_: str | list[str]) -> Callable[[T], bool]:
             m.desc.lower(),
         )
         return (
-            not query_words
-            or any(any(w.lower() in s for w in query_words) for s in search_src)
+            not query.words
+            or any(any(w.lower() in s for w in query.words) for s in search_src)
         ) and (
-            not nquery_words
-            or all(all(w.lower() not in s for w in nquery_words) for s in search_src)
+            not query.nwords
+            or all(all(w.lower() not in s for w in query.nwords) for s in search_src)
         )
 
-    filters: list[Callable[[T], bool]] = []
-    nfilters: list[Callable[[T], bool]] = []
-    query_words: set[str] = set()
-    nquery_words: set[str] = set()
-
-    for word in input_:
-        if word and word[0] not in "#!":
-            if word[0] != "-":
-                query_words.add(word)
-            elif word[1:]:
-                nquery_words.add(word[1:])
-            continue
-        _filt = filters if word[0] == "#" else nfilters
-        for stag, filter_ in ADVANCED_SEARCH_FILTERS_SIMPLE.items():
-            if word[1:] == stag:
-                _filt.append(filter_)
-                continue
-        for atag, filter_ in ADVANCED_SEARCH_FILTERS_ARGS.items():
-            if word[1:].startswith(atag):
-                _filt.append(partial(filter_, value=word[1:].removeprefix(atag)))
-                continue
-
-    return lambda module: (
-        all(f(module) for f in filters)
-        and not any(f(module) for f in nfilters)
-        and keyword_filter(module)
-    )
+    return lambda module: any(query_filter(query, module) for query in queries)
+
+
+def _advanced_search_positions(
+    input_: str | list[str], view: RegistryView[T]
+) -> set[int]:
+    """Evaluate an advanced search by intersecting the posting lists of `view`."""
+
+    def filter_positions(tag: str, value: str | None) -> Collection[int]:
+        if value is None:
+            if (simple := ADVANCED_SEARCH_INDEXED_FILTERS_SIMPLE.get(tag)) is not None:
+                return simple(view)
+        elif (args := ADVANCED_SEARCH_INDEXED_FILTERS_ARGS.get(tag)) is not None:
+            return args(view, value=value)
+        # filters without index support check every module instead
+        return [i for i, m in enumerate(view) if _apply_filter(tag, value, m)]
+
+    result: set[int] = set()
+    for query in _parse_advanced_search(input_):
+        matched = set(range(len(view)))
+        if query.words:
+            matched = set().union(
+                *(view.search_positions(w, TEXT_INDEX) for w in query.words)
+            )
+        for tag, value in query.filters:
+            if matched:
+                matched.intersection_update(filter_positions(tag, value))
+        for tag, value in query.nfilters:
+            if matched:
+                matched.difference_update(filter_positions(tag, value))
+        for word in query.nwords:
+            if matched:
+                matched.difference_update(view.search_positions(word, TEXT_INDEX))
+        result |= matched
+    return result
 
 
 def advanced_search_filter(input_: str | list[str], module: T) -> bool:
     return _advanced_search_filter(input_)(module)
 
 
+def advanced_search_mask(input_: str | list[str], source: Sequence[T]) -> list[bool]:
+    """Check every module of `source` against an advanced search, in order.
+
+    Registry views are searched with their indexes, without building models.
+    """
+    if isinstance(source, RegistryView):
+        matched = _advanced_search_positions(input_, source)
+        return [i in matched for i in range(len(source))]
+    filt = _advanced_search_filter(input_)
+    return [filt(m) for m in source]
+
+
 def advanced_search(input_: str | list[str], source: Iterable[T]) -> list[T]:
+    if isinstance(source, RegistryView):
+        return [source[i] for i in sorted(_advanced_search_positions(input_, source))]
     filt = _advanced_search_filter(input_)
     return [m for m in source if filt(m)]
 
 
+def advanced_search_choice_filter(
+    packages: Sequence[T],
+) -> Callable[[str, Choice[T]], bool]:
+    """Build a `ListPrompt` filter which searches only once per input."""
+    positions = {id(p): i for i, p in enumerate(packages)}
+
+    @lru_cache(maxsize=16)
+    def search_mask(input_: str) -> list[bool]:
+        return advanced_search_mask(input_, packages)
+
+    return lambda input_, choice: search_mask(input_)[positions[id(choice.data)]]
+
+
 def cut_text(text: str, max_width: int, max_lines: int = 1) -> str:
     result: list[str] = []
     for __ in range(max_lines - 1):
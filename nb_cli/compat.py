@@ -10,6 +10,7 @@ from typing_extensions import Self
 from pydantic import VERSION, BaseModel
 
 T = TypeVar("T")
+M = TypeVar("M", bound=BaseModel)
 
 PYDANTIC_V2 = int(VERSION.split(".", 1)[0]) == 2
 
@@ -23,9 +24,11 @@ __all__ = (
     "Required",
     "extract_field_info",
     "model_config",
+    "model_construct",
     "model_dump",
     "model_field_validate",
     "model_fields",
+    "model_validate",
     "type_validate_json",
     "type_validate_python",
 )
@@ -180,6 +183,14 @@ if PYDANTIC_V2:  # pragma: pydantic-v2
             exclude_none=exclude_none,
         )
 
+    def model_construct(model: type[M], **values: Any) -> M:
+        """Create a model from trusted data without validation."""
+        return model.model_construct(**values)
+
+    def model_validate(model: type[M], data: Any) -> M:
+        """Validate data with given model."""
+        return model.model_validate(data)
+
     def type_validate_python(type_: type[T], data: Any) -> T:
         """Validate data with given type."""
         return TypeAdapter(type_).validate_python(data)
@@ -317,6 +328,14 @@ else:  # pragma: pydantic-v1
             exclude_none=exclude_none,
         )
 
+    def model_construct(model: type[M], **values: Any) -> M:
+        """Create a model from trusted data without validation."""
+        return model.construct(**values)
+
+    def model_validate(model: type[M], data: Any) -> M:
+        """Validate data with given model."""
+        return model.parse_obj(data)
+
     def type_validate_python(type_: type[T], data: Any) -> T:
         """Validate data with given type."""
         return parse_obj_as(type_, data)
@@ -0,0 +1,267 @@
+"""Shell completion answered from a precomputed command tree.
+
+Completing through click imports the whole cli, including the handlers and
+their dependencies, and discovers scripts with the project interpreter. The
+command tree is dumped to the cache whenever completion falls back to click,
+and later completions are answered from it, together with the cached
+package names and project scripts, without importing the cli.
+"""
+
+from collections.abc import Callable, Iterable
+import contextlib
+from importlib.metadata import entry_points
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal
+
+from nb_cli import __version__
+from nb_cli.consts import PLUGIN_COMMANDS_GROUP, PLUGINS_GROUP
+from nb_cli.handlers.data import CACHE_DIR
+from nb_cli.i18n import _
+
+if TYPE_CHECKING:
+    import click
+    from click.shell_completion import CompletionItem
+
+COMPLETE_VAR = "_NB_COMPLETE"
+"""Environment variable set by the shell completion scripts of click."""
+
+TREE_FILE = CACHE_DIR / "completion.json"
+
+_MODULE_NAMES = {"adapter": "adapters", "plugin": "plugins", "driver": "drivers"}
+_SOURCE_ATTR = "__nb_completion_source__"
+_CONFIG_FILE = "pyproject.toml"
+
+
+def _write_atomic(path: Path, data: Any) -> None:
+    import secrets
+
+    tmpfile = path.with_name(f"{path.name}.{secrets.token_hex(4)}.tmp")
+    try:
+        tmpfile.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmpfile, path)
+    except Exception:
+        pass  # completion cache is best effort
+    finally:
+        tmpfile.unlink(missing_ok=True)
+
+
+def _read_json(path: Path) -> Any:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+def package_names_path(module_type: Literal["adapter", "plugin", "driver"]) -> Path:
+    return CACHE_DIR / f"{_MODULE_NAMES[module_type]}.names"
+
+
+def dump_package_names(
+    module_type: Literal["adapter", "plugin", "driver"], names: Iterable[str]
+) -> None:
+    """Save the package names of the registry for completion."""
+    _write_atomic(package_names_path(module_type), list(dict.fromkeys(names)))
+
+
+def load_package_names(
+    module_type: Literal["adapter", "plugin", "driver"],
+) -> list[str]:
+    if (names := _read_json(package_names_path(module_type))) is not None:
+        return names
+    # registry cache written by older versions
+    modules = _read_json(CACHE_DIR / f"{_MODULE_NAMES[module_type]}.json") or ()
+    with contextlib.suppress(Exception):
+        return list(dict.fromkeys(module["project_link"] for module in modules))
+    return []
+
+
+def package_name_completer(
+    module_type: Literal["adapter", "plugin", "driver"],
+) -> Callable[["click.Context", "click.Parameter", str], list[str]]:
+    """Create a click `shell_complete` callback completing cached package names.
+
+    The callback is recognized when the command tree is dumped, so that the
+    fast completion offers the same names.
+    """
+
+    def complete(ctx: "click.Context", param: "click.Parameter", incomplete: str):
+        return [n for n in load_package_names(module_type) if n.startswith(incomplete)]
+
+    setattr(complete, _SOURCE_ATTR, module_type)
+    return complete
+
+
+def _tree_key() -> list[Any]:
+    # extensions may add commands
+    plugins = sorted(
+        f"{group}:{ep.name}={ep.value}"
+        for group in (PLUGINS_GROUP, PLUGIN_COMMANDS_GROUP)
+        for ep in entry_points(group=group)
+    )
+    return [__version__, plugins]
+
+
+def _dump_param(param: "click.Parameter", ctx: "click.Context") -> dict[str, Any]:
+    import click
+
+    # static candidates, e.g. choices or a file placeholder
+    items = [
+        [item.value, item.type, item.help]
+        for item in param.type.shell_complete(ctx, param, "")
+    ]
+    return {
+        "name": param.name,
+        "value": not (
+            isinstance(param, click.Option) and (param.is_flag or param.count)
+        ),
+        "nargs": param.nargs,
+        "items": items,
+        "source": getattr(param._custom_shell_complete, _SOURCE_ATTR, None),
+        "help": getattr(param, "help", None),
+    }
+
+
+def _dump_command(command: "click.Command", ctx: "click.Context") -> dict[str, Any]:
+    import click
+
+    node: dict[str, Any] = {
+        "help": command.get_short_help_str(),
+        "hidden": command.hidden,
+        "options": {},
+        "arguments": [],
+        "commands": {},
+        "aliases": {},
+    }
+    for param in command.get_params(ctx):
+        if isinstance(param, click.Option):
+            if not param.hidden:
+                for opt in (*param.opts, *param.secondary_opts):
+                    node["options"][opt] = _dump_param(param, ctx)
+        else:
+            node["arguments"].append(_dump_param(param, ctx))
+    if isinstance(command, click.Group):
+        # scripts of the main group are not listed, they are cached separately
+        for name in [*command.commands, *getattr(command, "_lazy_commands", ())]:
+            if (sub_command := command.get_command(ctx, name)) is None:
+                continue
+            sub_ctx = click.Context(sub_command, parent=ctx, info_name=name)
+            node["commands"][name] = _dump_command(sub_command, sub_ctx)
+        node["aliases"] = dict(getattr(command, "_aliases", {}))
+    return node
+
+
+def dump_completion_tree(cli: "click.Command") -> None:
+    """Save the command tree of the cli if it is outdated."""
+    import click
+
+    key = _tree_key()
+    if (data := _read_json(TREE_FILE)) is not None and data.get("key") == key:
+        return
+    tree = _dump_command(cli, click.Context(cli, info_name="nb"))
+    _write_atomic(TREE_FILE, {"key": key, "tree": tree})
+
+
+def _cached_scripts(cwd: str | None) -> list[str]:
+    directory = Path(cwd or os.getcwd()).resolve()
+    for project in (directory, *directory.parents):
+        if project.joinpath(_CONFIG_FILE).is_file():
+            break
+    else:
+        return []
+    data = _read_json(CACHE_DIR / "interpreters.json") or {}
+    entry = data.get("scripts", {}).get(str(project))
+    return entry["scripts"] if entry else []
+
+
+def _complete_param(spec: dict[str, Any], incomplete: str) -> list["CompletionItem"]:
+    from click.shell_completion import CompletionItem
+
+    if spec["source"] is not None:
+        names = load_package_names(spec["source"])
+        return [CompletionItem(n) for n in names if n.startswith(incomplete)]
+    return [
+        CompletionItem(incomplete if type_ != "plain" else value, type_, help_)
+        for value, type_, help_ in spec["items"]
+        if type_ != "plain" or str(value).startswith(incomplete)
+    ]
+
+
+def complete(
+    tree: dict[str, Any], args: list[str], incomplete: str
+) -> list["CompletionItem"]:
+    """Get the completions of `incomplete` after the complete `args`."""
+    from click.shell_completion import CompletionItem
+
+    node, positional, cwd = tree, 0, None
+    pending: dict[str, Any] | None = None
+    for arg in args:
+        if pending is not None:
+            if node is tree and pending["name"] == "cwd":
+                cwd = arg
+            pending = None
+        elif arg.startswith("-") and arg != "-":
+            name, eq, __ = arg.partition("=")
+            if (spec := node["options"].get(name)) and spec["value"] and not eq:
+                pending = spec
+        elif (name := node["aliases"].get(arg, arg)) in node["commands"]:
+            node, positional = node["commands"][name], 0
+        else:
+            positional += 1
+
+    if pending is not None:
+        return _complete_param(pending, incomplete)
+    if incomplete.startswith("-"):
+        return [
+            CompletionItem(opt, help=spec["help"])
+            for opt, spec in node["options"].items()
+            if opt.startswith(incomplete)
+        ]
+    if node["commands"]:
+        items = [
+            CompletionItem(name, help=sub["help"])
+            for name, sub in node["commands"].items()
+            if not sub["hidden"] and name.startswith(incomplete)
+        ]
+        if node is tree:
+            items.extend(
+                CompletionItem(
+                    name,
+                    help=_("Run script {script_name!r}").format(script_name=name),
+                )
+                for name in _cached_scripts(cwd)
+                if name.startswith(incomplete)
+            )
+        return items
+    for spec in node["arguments"]:
+        if spec["nargs"] < 0 or positional < spec["nargs"]:
+            return _complete_param(spec, incomplete)
+        positional -= spec["nargs"]
+    return []
+
+
+def fast_complete() -> bool:
+    """Answer a completion request from the command tree.
+
+    Returns:
+        Whether the request is answered. Otherwise completion should fall back
+        to click.
+    """
+    shell, __, action = os.environ.get(COMPLETE_VAR, "").partition("_")
+    if action != "complete":
+        return False
+    data = _read_json(TREE_FILE)
+    if data is None or data.get("key") != _tree_key():
+        return False
+
+    import click
+    from click.shell_completion import get_completion_class
+
+    if (comp_cls := get_completion_class(shell)) is None:
+        return False
+    comp = comp_cls(None, {}, "nb", COMPLETE_VAR)  # pyright: ignore[reportArgumentType]
+    args, incomplete = comp.get_completion_args()
+    items = complete(data["tree"], args, incomplete)
+    click.echo("\n".join(comp.format_completion(item) for item in items))
+    return True
@@ -1,15 +1,20 @@
 from abc import ABCMeta, abstractmethod
-from collections.abc import Generator
-from contextlib import AbstractContextManager, contextmanager
+from collections.abc import Generator, Iterator
+from contextlib import AbstractContextManager, contextmanager, suppress
 import functools
 import logging
+import os
 from pathlib import Path
+import pickle
+import secrets
+import shutil
 import string
 from typing import Any, ClassVar, Generic, TypeVar, overload
 import weakref
 
 import click
 from packaging.requirements import Requirement
+from packaging.utils import canonicalize_name
 import tomlkit
 import tomlkit.container
 import tomlkit.items
@@ -20,6 +25,7 @@ from nb_cli.compat import model_dump, type_validate_python
 from nb_cli.consts import WINDOWS
 from nb_cli.exceptions import ProjectInvalidError, ProjectNotFoundError
 from nb_cli.log import SUCCESS
+from nb_cli.profiling import profiled
 
 from .model import LegacyNoneBotConfig, NoneBotConfig, PackageInfo, SimpleInfo
 
@@ -33,10 +39,23 @@ _T = TypeVar("_T")
 _U = TypeVar("_U")
 
 
+def _write_atomic(path: Path, text: str) -> None:
+    tmpfile = path.with_name(f"{path.name}.{secrets.token_hex(4)}.tmp")
+    try:
+        tmpfile.write_text(text, encoding=CONFIG_FILE_ENCODING)
+        with suppress(FileNotFoundError):
+            shutil.copymode(path, tmpfile)
+        os.replace(tmpfile, path)
+    finally:
+        tmpfile.unlink(missing_ok=True)
+
+
 def _merge_package_requirements(
     base: Requirement, override: Requirement
 ) -> Requirement:
-    assert base.name == override.name, "Cannot merge different package requirements."
+    assert canonicalize_name(base.name) == canonicalize_name(override.name), (
+        "Cannot merge different package requirements."
+    )
     name = base.name
     specs = override.specifier if override.specifier else base.specifier
     extras = sorted(base.extras | override.extras)
@@ -54,7 +73,9 @@ def _merge_package_requirements(
 def _remove_package_requirements(
     base: Requirement, remove: Requirement
 ) -> Requirement | None:
-    assert base.name == remove.name, "Cannot remove different package requirements."
+    assert canonicalize_name(base.name) == canonicalize_name(remove.name), (
+        "Cannot remove different package requirements."
+    )
     if not remove.extras:
         return None
     name = base.name
@@ -71,6 +92,111 @@ def _remove_package_requirements(
     return Requirement(new_req_str)
 
 
+def _dependency_array(dependencies: list[str]) -> tomlkit.items.Array:
+    # Array.extend reindexes the array on every item, build it at once instead
+    return tomlkit.items.Array(
+        [tomlkit.item(d) for d in dependencies], tomlkit.items.Trivia(), multiline=True
+    )
+
+
+class _DependencySet:
+    """Dependency list indexed by PEP 503 normalized package names.
+
+    The order of dependencies is kept, and unchanged ones keep their original
+    text. Duplicated dependencies are merged into the first one when changed.
+    """
+
+    def __init__(self, dependencies: list[str]) -> None:
+        self._requirements: list[Requirement | None] = []
+        self._texts: list[str | None] = []
+        self._index: dict[str, list[int]] = {}
+        self._size = len(dependencies)
+        for text in dependencies:
+            self._append(Requirement(text), str(text))
+
+    def _append(self, requirement: Requirement, text: str | None = None) -> None:
+        self._index.setdefault(canonicalize_name(requirement.name), []).append(
+            len(self._requirements)
+        )
+        self._requirements.append(requirement)
+        self._texts.append(text)
+
+    def _pop_all(self, name: str) -> tuple[int, Requirement] | None:
+        """Take the dependencies of `name` merged, leaving the first position."""
+        positions = self._index.get(canonicalize_name(name))
+        if not positions:
+            return None
+        merged = functools.reduce(
+            _merge_package_requirements,
+            (r for i in positions if (r := self._requirements[i]) is not None),
+        )
+        for i in positions[1:]:
+            self._requirements[i] = None
+        del positions[1:]
+        return positions[0], merged
+
+    def __contains__(self, name: str) -> bool:
+        return bool(self._index.get(canonicalize_name(name)))
+
+    def merge(self, requirement: Requirement) -> None:
+        """Merge the requirement into the dependency, or append it if missing."""
+        if (found := self._pop_all(requirement.name)) is None:
+            self._append(requirement)
+            return
+        idx, merged = found
+        self._requirements[idx] = _merge_package_requirements(merged, requirement)
+        self._texts[idx] = None
+
+    def remove(self, requirement: Requirement) -> bool:
+        """Remove the requirement, or only its extras if given.
+
+        Returns:
+            bool: Whether the dependency is completely removed.
+        """
+        if (found := self._pop_all(requirement.name)) is None:
+            return True
+        idx, merged = found
+        self._requirements[idx] = _remove_package_requirements(merged, requirement)
+        self._texts[idx] = None
+        if self._requirements[idx] is not None:
+            return False
+        del self._index[canonicalize_name(requirement.name)]
+        return True
+
+    def dump(self) -> list[str]:
+        return [
+            text if text is not None else str(requirement)
+            for requirement, text in zip(self._requirements, self._texts)
+            if requirement is not None
+        ]
+
+    def apply(self, array: tomlkit.items.Array) -> None:
+        """Write the changes into the array the set was created from, in place.
+
+        Unchanged items keep their comments and the layout of the array.
+        """
+        removed: list[int] = []
+        for i in range(self._size):
+            if (requirement := self._requirements[i]) is None:
+                removed.append(i)
+            elif self._texts[i] is None:
+                array[i] = str(requirement)
+        for i in reversed(removed):
+            del array[i]
+        for requirement in self._requirements[self._size :]:
+            if requirement is not None:
+                array.append(str(requirement))
+
+
+def _set_dependency_array(
+    container: dict[str, Any], key: str, deps: _DependencySet
+) -> None:
+    if isinstance(array := container.get(key), tomlkit.items.Array) and array:
+        deps.apply(array)
+    else:
+        container[key] = _dependency_array(deps.dump())
+
+
 class _ConfigPolicy(Generic[_T_config], metaclass=ABCMeta):
     policies: ClassVar[list[type["_ConfigPolicy[Any]"]]] = []
 
@@ -133,6 +259,7 @@ class ConfigManager:
     _global_python_path: ClassVar[str | None] = None
     _global_use_venv: ClassVar[bool] = True
     _path_venv_cache: ClassVar[dict[Path, str | None]] = {}
+    _document_cache: ClassVar[dict[Path, tuple[tuple[int, int], bytes]]] = {}
     _policy: _ConfigPolicy[Any]
 
     def __init__(
@@ -147,6 +274,12 @@ class ConfigManager:
         self._python_path = python_path
         self._use_venv = use_venv
         self._logger = logger
+        self._working_dir_memo: tuple[Path, Path] | None = None
+        self._project_root_memo: tuple[Path, Path] | None = None
+        self._venv_memo: tuple[Path, int, str | None] | None = None
+        self._transaction_depth = 0
+        self._transaction_data: TOMLDocument | None = None
+        self._transaction_dirty = False
 
     @property
     def policy(self) -> _ConfigPolicy[Any]:
@@ -156,10 +289,13 @@ class ConfigManager:
 
     @property
     def working_dir(self) -> Path:
-        return (self._working_dir or self._global_working_dir or Path.cwd()).resolve()
+        working_dir = self._working_dir or self._global_working_dir or Path.cwd()
+        if self._working_dir_memo is None or self._working_dir_memo[0] != working_dir:
+            self._working_dir_memo = (working_dir, working_dir.resolve())
+        return self._working_dir_memo[1]
 
     def _select_policy(self) -> _ConfigPolicy[Any]:
-        cfg = self._get_nonebot_config(self._get_data())
+        cfg = dict(self._get_nonebot_config(self._get_data()))
         if isinstance(cfg.setdefault("plugin_dirs", []), list) and isinstance(
             cfg.setdefault("builtin_plugins", []), list
         ):
@@ -182,7 +318,13 @@ class ConfigManager:
 
     @property
     def project_root(self) -> Path:
-        return self._locate_project_root(self.working_dir)
+        working_dir = self.working_dir
+        if self._project_root_memo is None or self._project_root_memo[0] != working_dir:
+            self._project_root_memo = (
+                working_dir,
+                self._locate_project_root(working_dir),
+            )
+        return self._project_root_memo[1]
 
     @property
     def config_file(self) -> Path:
@@ -199,20 +341,33 @@ class ConfigManager:
                     / ("python.exe" if WINDOWS else "python")
                 )
 
+    def _find_virtual_env(self, cwd: Path) -> str | None:
+        """Detect the virtual env, reusing the result until `cwd` is modified."""
+        try:
+            mtime = cwd.stat().st_mtime_ns
+        except OSError:
+            return self._detect_virtual_env(cwd)
+        if self._venv_memo is not None and self._venv_memo[:2] == (cwd, mtime):
+            return self._venv_memo[2]
+
+        venv_python = self._detect_virtual_env(cwd)
+        self._venv_memo = (cwd, mtime, venv_python)
+        return venv_python
+
     @property
     def python_path(self) -> str | None:
         if python := (self._python_path or self._global_python_path):
             return python
         elif self.use_venv:
             try:
-                cwd = self.project_root.resolve()
+                cwd = self.project_root
             except ProjectNotFoundError:
                 cwd = Path.cwd().resolve()
 
             if cwd in self._path_venv_cache:
                 return self._path_venv_cache[cwd]
 
-            if venv_python := self._detect_virtual_env(cwd):
+            if venv_python := self._find_virtual_env(cwd):
                 self._path_venv_cache[cwd] = venv_python
                 if self._logger:
                     self._logger.log(
@@ -227,11 +382,72 @@ class ConfigManager:
     def use_venv(self) -> bool:
         return self._use_venv if self._use_venv is not None else self._global_use_venv
 
+    @staticmethod
+    def _file_key(path: Path) -> tuple[int, int]:
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _cache_document(self, path: Path, key: tuple[int, int], data: TOMLDocument):
+        # documents are pickled, since callers modify the document they get
+        # and unpickling is much faster than parsing
+        try:
+            self._document_cache[path] = (key, pickle.dumps(data))
+        except Exception:
+            self._document_cache.pop(path, None)
+
+    def _read_data(self) -> TOMLDocument:
+        path = self.config_file
+        key = self._file_key(path)
+        if (cached := self._document_cache.get(path)) and cached[0] == key:
+            return pickle.loads(cached[1])
+        data = tomlkit.parse(path.read_text(encoding=CONFIG_FILE_ENCODING))
+        self._cache_document(path, key, data)
+        return data
+
+    def _save_data(self, data: TOMLDocument) -> None:
+        path = self.config_file
+        # keep the config file a symlink if it is
+        _write_atomic(path.resolve(), tomlkit.dumps(data))
+        self._cache_document(path, self._file_key(path), data)
+
+    @profiled("ConfigManager._get_data")
     def _get_data(self) -> TOMLDocument:
-        return tomlkit.parse(self.config_file.read_text(encoding=CONFIG_FILE_ENCODING))
+        if not self._transaction_depth:
+            return self._read_data()
+        if self._transaction_data is None:
+            self._transaction_data = self._read_data()
+        return self._transaction_data
 
     def _write_data(self, data: TOMLDocument) -> None:
-        self.config_file.write_text(tomlkit.dumps(data), encoding=CONFIG_FILE_ENCODING)
+        if not self._transaction_depth:
+            self._save_data(data)
+            return
+        self._transaction_data = data
+        self._transaction_dirty = True
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Apply all config edits in the context to one document.
+
+        The document is read on the first access in the context and written
+        once when the context exits without error, otherwise the edits are
+        discarded. Nested transactions join the outermost one. Tools editing
+        the config file themselves must not run after the first access.
+        """
+        self._transaction_depth += 1
+        try:
+            yield
+            if (
+                self._transaction_depth == 1
+                and self._transaction_dirty
+                and self._transaction_data is not None
+            ):
+                self._save_data(self._transaction_data)
+        finally:
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                self._transaction_data = None
+                self._transaction_dirty = False
 
     @overload
     def _data_context(
@@ -297,6 +513,21 @@ class ConfigManager:
     def get_nonebot_config(self) -> NoneBotConfig | LegacyNoneBotConfig:
         return self.policy.get_nonebot_config()
 
+    def get_registry_mirrors(self) -> list[str]:
+        """Get the custom registry mirrors in `[tool.nb-cli]` of the project.
+
+        Raises:
+            ProjectInvalidError: If the mirrors are not a list of strings.
+        """
+        table = self._get_data().get("tool", {}).get("nb-cli", {})
+        mirrors = table.get("registry-mirrors", []) if isinstance(table, dict) else None
+        valid = isinstance(mirrors, list) and all(isinstance(m, str) for m in mirrors)
+        if not valid:
+            raise ProjectInvalidError(
+                _("Invalid registry-mirrors in [tool.nb-cli]: must be a list of urls.")
+            )
+        return list(mirrors)
+
     def update_nonebot_config(
         self, config: NoneBotConfig | LegacyNoneBotConfig
     ) -> None:
@@ -324,19 +555,14 @@ class ConfigManager:
         self._write_data(data)
         self._policy = self._select_policy()  # update access policy
 
-    def get_dependencies(self, *, group: str | None = None) -> list[Requirement]:
+    def _get_raw_dependencies(self, group: str | None = None) -> list[str]:
         data = self._get_data()
         if group is None:
-            deps: list[str] = data.setdefault("project", {}).setdefault(
-                "dependencies", []
-            )
-        else:
-            deps: list[str] = (
-                data.setdefault("project", {})
-                .setdefault("dependency-groups", {})
-                .setdefault(group, [])
-            )
-        return [Requirement(d) for d in deps]
+            return data.get("project", {}).get("dependencies", [])
+        return data.get("project", {}).get("dependency-groups", {}).get(group, [])
+
+    def get_dependencies(self, *, group: str | None = None) -> list[Requirement]:
+        return [Requirement(d) for d in self._get_raw_dependencies(group)]
 
     def add_dependency(
         self, *dependencies: str | PackageInfo | Requirement, group: str | None = None
@@ -344,7 +570,7 @@ class ConfigManager:
         if not dependencies:
             return
 
-        deps = self.get_dependencies(group=group)
+        deps = _DependencySet(self._get_raw_dependencies(group))
         with self._data_context("project", dict[str, Any]()) as project:
             for dependency in dependencies:
                 depinfo = (
@@ -356,19 +582,8 @@ class ConfigManager:
                     if isinstance(dependency, (str, PackageInfo))
                     else dependency
                 )
-                matches = [i for i, d in enumerate(deps) if d.name == depinfo.name]
-
-                if matches:
-                    idx = matches[0]
-                    deps[idx] = functools.reduce(
-                        _merge_package_requirements, (deps[i] for i in matches)
-                    )
-
-                    for i in sorted(matches[1:], reverse=True):
-                        del deps[i]
 
-                    deps[idx] = _merge_package_requirements(deps[idx], depinfo)
-                else:
+                if depinfo.name not in deps:
                     depinfo = (
                         Requirement(
                             dependency
@@ -378,22 +593,19 @@ class ConfigManager:
                         if isinstance(dependency, (str, PackageInfo))
                         else dependency
                     )
-                    deps.append(depinfo)
+                deps.merge(depinfo)
 
             if group is None:
-                project["dependencies"] = tomlkit.array().multiline(True)
-                project["dependencies"].extend(str(d) for d in deps)
+                _set_dependency_array(project, "dependencies", deps)
             else:
-                project["dependency-groups"] = tomlkit.table()
-                gdep = tomlkit.array().multiline(True)
-                gdep.extend(str(d) for d in deps)
-                project["dependency-groups"].add(group, gdep)
+                groups = project.setdefault("dependency-groups", tomlkit.table())
+                _set_dependency_array(groups, group, deps)
 
     def update_dependency(self, *dependencies: PackageInfo | Requirement) -> None:
         if not dependencies:
             return
 
-        deps = self.get_dependencies()
+        deps = _DependencySet(self._get_raw_dependencies())
         with self._data_context("project", dict[str, Any]()) as project:
             for dependency in dependencies:
                 depinfo = (
@@ -401,23 +613,9 @@ class ConfigManager:
                     if isinstance(dependency, PackageInfo)
                     else dependency
                 )
-                matches = [i for i, d in enumerate(deps) if d.name == depinfo.name]
+                deps.merge(depinfo)
 
-                if matches:
-                    idx = matches[0]
-                    deps[idx] = functools.reduce(
-                        _merge_package_requirements, (deps[i] for i in matches)
-                    )
-
-                    for i in sorted(matches[1:], reverse=True):
-                        del deps[i]
-
-                    deps[idx] = _merge_package_requirements(deps[idx], depinfo)
-                else:
-                    deps.append(depinfo)
-
-            project["dependencies"] = tomlkit.array().multiline(True)
-            project["dependencies"].extend(str(d) for d in deps)
+            _set_dependency_array(project, "dependencies", deps)
 
     def remove_dependency(
         self, *dependencies: str | PackageInfo | Requirement
@@ -433,10 +631,9 @@ class ConfigManager:
 
         removables: list[Requirement] = []
 
-        deps = self.get_dependencies()
+        deps = _DependencySet(self._get_raw_dependencies())
         with self._data_context("project", dict[str, Any]()) as project:
             for dependency in dependencies:
-                status = True
                 depinfo = (
                     Requirement(
                         dependency
@@ -446,21 +643,10 @@ class ConfigManager:
                     if isinstance(dependency, (str, PackageInfo))
                     else dependency
                 )
-
-                def _convert(d: Requirement) -> Requirement | None:
-                    nonlocal status
-                    if d.name != depinfo.name:
-                        return d
-                    res = _remove_package_requirements(d, depinfo)
-                    status *= res is None
-                    return res
-
-                deps = [d for d in (_convert(d) for d in deps) if d is not None]
-                if status:
+                if deps.remove(depinfo):
                     removables.append(depinfo)
 
-            project["dependencies"] = tomlkit.array().multiline(True)
-            project["dependencies"].extend(str(d) for d in deps)
+            _set_dependency_array(project, "dependencies", deps)
 
         return removables
 
@@ -3,6 +3,7 @@ import sys
 
 # consts
 PLUGINS_GROUP = "nb"
+PLUGIN_COMMANDS_GROUP = "nb_commands"
 SCRIPTS_GROUP = "nb_scripts"
 REQUIRES_PYTHON = (3, 10)
 DEFAULT_DRIVER = ("FastAPI",)
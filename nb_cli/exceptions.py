@@ -32,3 +32,7 @@ class NoSelectablePackageError(RuntimeError):
 
 class ProcessExecutionError(RuntimeError):
     """Raised when a subprocess execution fails."""
+
+
+class ProbeServerError(RuntimeError):
+    """Raised when the probe server fails to answer a request."""
@@ -1,116 +1,254 @@
+from importlib import import_module
 from pathlib import Path
-
-from jinja2 import Environment, FileSystemLoader
+from typing import TYPE_CHECKING, Any
 
 from nb_cli.consts import SCRIPTS_GROUP
 
-templates = Environment(
-    trim_blocks=True,
-    lstrip_blocks=True,
-    autoescape=False,
-    loader=FileSystemLoader(Path(__file__).parent.parent / "template" / "scripts"),
-    enable_async=True,
-)
-templates.globals["ENTRYPOINT_GROUP"] = SCRIPTS_GROUP
-templates.filters["repr"] = repr
-
-# meta
-from .meta import draw_logo as draw_logo
-from .meta import get_default_python as get_default_python
-from .meta import get_nonebot_config as get_nonebot_config
-from .meta import get_nonebot_version as get_nonebot_version
-from .meta import get_pip_version as get_pip_version
-from .meta import get_project_root as get_project_root
-from .meta import get_python_version as get_python_version
-from .meta import requires_nonebot as requires_nonebot
-from .meta import requires_pip as requires_pip
-from .meta import requires_project_root as requires_project_root
-from .meta import requires_python as requires_python
-
-# isort: split
-
-# data
-from .data import CACHE_DIR as CACHE_DIR
-from .data import CONFIG_DIR as CONFIG_DIR
-from .data import DATA_DIR as DATA_DIR
-
-# isort: split
-
-# package
-from .store import download_module_data as download_module_data
-from .store import load_module_data as load_module_data
-
-# isort: split
-
-# process
-from .process import create_process as create_process
-from .process import create_process_shell as create_process_shell
-from .process import ensure_process_terminated as ensure_process_terminated
-from .process import terminate_process as terminate_process
-
-# isort: split
-
-from .environment import EnvironmentExecutor as EnvironmentExecutor
-from .environment import all_environment_managers as all_environment_managers
-from .environment import probe_environment_manager as probe_environment_manager
-
-# isort: split
-
-# pip
-from .pip import call_pip as call_pip
-from .pip import call_pip_install as call_pip_install
-from .pip import call_pip_list as call_pip_list
-from .pip import call_pip_uninstall as call_pip_uninstall
-from .pip import call_pip_update as call_pip_update
-
-# isort: split
-
-# virtualenv
-from .venv import create_virtualenv as create_virtualenv
-from .venv import detect_virtualenv as detect_virtualenv
-
-# isort: split
-
-# signal
-from .signal import install_signal_handler as install_signal_handler
-from .signal import register_signal_handler as register_signal_handler
-from .signal import remove_signal_handler as remove_signal_handler
-from .signal import shield_signals as shield_signals
-
-# isort: split
-
-# plugin
-from .plugin import create_plugin as create_plugin
-from .plugin import list_builtin_plugins as list_builtin_plugins
-from .plugin import list_installed_plugins as list_installed_plugins
-from .plugin import list_plugins as list_plugins
-
-# isort: split
-
-# adapter
-from .adapter import create_adapter as create_adapter
-from .adapter import list_adapters as list_adapters
-from .adapter import list_installed_adapters as list_installed_adapters
-
-# isort: split
-
-# driver
-from .driver import list_drivers as list_drivers
-
-# isort: split
-
-# script
-from .script import list_scripts as list_scripts
-from .script import run_script as run_script
-
-# isort: split
-
-# project
-from .project import create_project as create_project
-from .project import downgrade_project_format as downgrade_project_format
-from .project import generate_run_script as generate_run_script
-from .project import list_project_templates as list_project_templates
-from .project import run_project as run_project
-from .project import upgrade_project_format as upgrade_project_format
-from .reloader import FileFilter as FileFilter
-from .reloader import Reloader as Reloader
+if TYPE_CHECKING:
+    from jinja2 import Environment
+
+    templates: Environment
+
+    # meta
+    from .meta import draw_logo as draw_logo
+    from .meta import get_default_python as get_default_python
+    from .meta import get_installed_distributions as get_installed_distributions
+    from .meta import get_interpreter_info as get_interpreter_info
+    from .meta import get_nonebot_config as get_nonebot_config
+    from .meta import get_nonebot_version as get_nonebot_version
+    from .meta import get_package_install_states as get_package_install_states
+    from .meta import get_pip_version as get_pip_version
+    from .meta import get_project_root as get_project_root
+    from .meta import get_python_version as get_python_version
+    from .meta import requires_nonebot as requires_nonebot
+    from .meta import requires_pip as requires_pip
+    from .meta import requires_project_root as requires_project_root
+    from .meta import requires_python as requires_python
+
+    # isort: split
+
+    # data
+    from .data import CACHE_DIR as CACHE_DIR
+    from .data import CONFIG_DIR as CONFIG_DIR
+    from .data import DATA_DIR as DATA_DIR
+
+    # isort: split
+
+    # network
+    from .network import close_http_client as close_http_client
+    from .network import get_http_client as get_http_client
+    from .network import http_stream as http_stream
+
+    # isort: split
+
+    # package
+    from .store import download_module_data as download_module_data
+    from .store import ModuleDataBatch as ModuleDataBatch
+    from .store import load_module_data as load_module_data
+    from .store import load_module_data_batch as load_module_data_batch
+
+    # isort: split
+
+    # process
+    from .process import create_process as create_process
+    from .process import create_process_shell as create_process_shell
+    from .process import ensure_process_terminated as ensure_process_terminated
+    from .process import terminate_process as terminate_process
+
+    # isort: split
+
+    # probe
+    from .probe import run_probe as run_probe
+    from .probe import stop_probe_servers as stop_probe_servers
+
+    # isort: split
+
+    from .environment import EnvironmentExecutor as EnvironmentExecutor
+    from .environment import all_environment_managers as all_environment_managers
+    from .environment import probe_environment_manager as probe_environment_manager
+
+    # isort: split
+
+    # pip
+    from .pip import call_pip as call_pip
+    from .pip import call_pip_install as call_pip_install
+    from .pip import call_pip_list as call_pip_list
+    from .pip import call_pip_uninstall as call_pip_uninstall
+    from .pip import call_pip_update as call_pip_update
+
+    # isort: split
+
+    # virtualenv
+    from .venv import create_virtualenv as create_virtualenv
+    from .venv import detect_virtualenv as detect_virtualenv
+
+    # isort: split
+
+    # signal
+    from .signal import install_signal_handler as install_signal_handler
+    from .signal import register_signal_handler as register_signal_handler
+    from .signal import remove_signal_handler as remove_signal_handler
+    from .signal import shield_signals as shield_signals
+
+    # isort: split
+
+    # plugin
+    from .plugin import create_plugin as create_plugin
+    from .plugin import list_builtin_plugins as list_builtin_plugins
+    from .plugin import list_installed_plugins as list_installed_plugins
+    from .plugin import list_plugins as list_plugins
+
+    # isort: split
+
+    # adapter
+    from .adapter import create_adapter as create_adapter
+    from .adapter import list_adapters as list_adapters
+    from .adapter import list_installed_adapters as list_installed_adapters
+
+    # isort: split
+
+    # driver
+    from .driver import list_drivers as list_drivers
+
+    # isort: split
+
+    # script
+    from .script import list_scripts as list_scripts
+    from .script import run_script as run_script
+
+    # isort: split
+
+    # project
+    from .project import create_project as create_project
+    from .project import downgrade_project_format as downgrade_project_format
+    from .project import generate_run_script as generate_run_script
+    from .project import list_project_templates as list_project_templates
+    from .project import run_project as run_project
+    from .project import upgrade_project_format as upgrade_project_format
+    from .reloader import FileFilter as FileFilter
+    from .reloader import Reloader as Reloader
+
+    # isort: split
+
+    # workspace
+    from .workspace import discover_projects as discover_projects
+    from .workspace import find_workspace_file as find_workspace_file
+    from .workspace import load_workspace_file as load_workspace_file
+    from .workspace import run_in_projects as run_in_projects
+
+_LAZY_ATTRS: dict[str, str] = {
+    # meta
+    "draw_logo": "meta",
+    "get_default_python": "meta",
+    "get_installed_distributions": "meta",
+    "get_interpreter_info": "meta",
+    "get_nonebot_config": "meta",
+    "get_nonebot_version": "meta",
+    "get_package_install_states": "meta",
+    "get_pip_version": "meta",
+    "get_project_root": "meta",
+    "get_python_version": "meta",
+    "requires_nonebot": "meta",
+    "requires_pip": "meta",
+    "requires_project_root": "meta",
+    "requires_python": "meta",
+    # data
+    "CACHE_DIR": "data",
+    "CONFIG_DIR": "data",
+    "DATA_DIR": "data",
+    # network
+    "close_http_client": "network",
+    "get_http_client": "network",
+    "http_stream": "network",
+    # package
+    "download_module_data": "store",
+    "ModuleDataBatch": "store",
+    "load_module_data": "store",
+    "load_module_data_batch": "store",
+    # process
+    "create_process": "process",
+    "create_process_shell": "process",
+    "ensure_process_terminated": "process",
+    "terminate_process": "process",
+    # probe
+    "run_probe": "probe",
+    "stop_probe_servers": "probe",
+    "EnvironmentExecutor": "environment",
+    "all_environment_managers": "environment",
+    "probe_environment_manager": "environment",
+    # pip
+    "call_pip": "pip",
+    "call_pip_install": "pip",
+    "call_pip_list": "pip",
+    "call_pip_uninstall": "pip",
+    "call_pip_update": "pip",
+    # virtualenv
+    "create_virtualenv": "venv",
+    "detect_virtualenv": "venv",
+    # signal
+    "install_signal_handler": "signal",
+    "register_signal_handler": "signal",
+    "remove_signal_handler": "signal",
+    "shield_signals": "signal",
+    # plugin
+    "create_plugin": "plugin",
+    "list_builtin_plugins": "plugin",
+    "list_installed_plugins": "plugin",
+    "list_plugins": "plugin",
+    # adapter
+    "create_adapter": "adapter",
+    "list_adapters": "adapter",
+    "list_installed_adapters": "adapter",
+    # driver
+    "list_drivers": "driver",
+    # script
+    "list_scripts": "script",
+    "run_script": "script",
+    # project
+    "create_project": "project",
+    "downgrade_project_format": "project",
+    "generate_run_script": "project",
+    "list_project_templates": "project",
+    "run_project": "project",
+    "upgrade_project_format": "project",
+    "FileFilter": "reloader",
+    "Reloader": "reloader",
+    # workspace
+    "discover_projects": "workspace",
+    "find_workspace_file": "workspace",
+    "load_workspace_file": "workspace",
+    "run_in_projects": "workspace",
+}
+"""Public names of the handlers, mapped to the submodule defining them."""
+
+
+def _create_templates() -> "Environment":
+    from jinja2 import Environment, FileSystemLoader
+
+    templates = Environment(
+        trim_blocks=True,
+        lstrip_blocks=True,
+        autoescape=False,
+        loader=FileSystemLoader(Path(__file__).parent.parent / "template" / "scripts"),
+        enable_async=True,
+    )
+    templates.globals["ENTRYPOINT_GROUP"] = SCRIPTS_GROUP
+    templates.filters["repr"] = repr
+    return templates
+
+
+def __getattr__(name: str) -> Any:
+    # submodules and their dependencies are imported on first use,
+    # so that each command only pays for the handlers it needs
+    if name == "templates":
+        value = _create_templates()
+    elif (module := _LAZY_ATTRS.get(name)) is not None:
+        value = getattr(import_module(f".{module}", __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), "templates", *_LAZY_ATTRS})
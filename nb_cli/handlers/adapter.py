@@ -1,12 +1,13 @@
+from collections.abc import Sequence
 from pathlib import Path
 
-from cookiecutter.main import cookiecutter
 
 from nb_cli.compat import model_dump
 from nb_cli.config import Adapter, LegacyNoneBotConfig, NoneBotConfig
 from nb_cli.exceptions import ProjectInvalidError
 
 from .meta import get_nonebot_config, requires_project_root
+from .registry import TEXT_INDEX
 from .store import load_module_data, load_unpublished_modules
 
 TEMPLATE_ROOT = Path(__file__).parent.parent / "template" / "adapter"
@@ -17,6 +18,8 @@ def create_adapter(
     output_dir: str = ".",
     template: str | None = None,
 ):
+    from cookiecutter.main import cookiecutter
+
     cookiecutter(
         str(TEMPLATE_ROOT.resolve()) if template is None else template,
         no_input=True,
@@ -27,16 +30,17 @@ def create_adapter(
 
 async def list_adapters(
     query: str | None = None, include_unpublished: bool = False
-) -> list[Adapter]:
+) -> Sequence[Adapter]:
     adapters = await load_module_data("adapter")
     if include_unpublished:
         adapters = adapters + await load_unpublished_modules(Adapter)
     if query is None:
         return adapters
 
+    # index narrows down the candidates case-insensitively
     return [
         adapter
-        for adapter in adapters
+        for adapter in adapters.search(query, TEXT_INDEX)
         if any(
             query in value
             for value in model_dump(
@@ -53,8 +57,6 @@ async def list_installed_adapters(*, cwd: Path | None = None) -> list[Adapter]:
         Adapter
     )
 
-    result: list[Adapter] = []
-
     if isinstance(config_data, NoneBotConfig):
         adapter_info = config_data.adapters
         allowed_pairs = {
@@ -62,16 +64,10 @@ async def list_installed_adapters(*, cwd: Path | None = None) -> list[Adapter]:
             for pkg_name, modules in adapter_info.items()
             for m in modules
         }
-        for adapter in adapters:
-            if (adapter.project_link, adapter.module_name) in allowed_pairs:
-                result.append(adapter)
+        return adapters.lookup_many(("project_link", "module_name"), allowed_pairs)
     elif isinstance(config_data, LegacyNoneBotConfig):
         adapter_info = config_data.adapters
         allowed_pairs = {m.module_name for m in adapter_info}
-        for adapter in adapters:
-            if adapter.module_name in allowed_pairs:
-                result.append(adapter)
+        return adapters.lookup_many("module_name", allowed_pairs)
     else:
         raise ProjectInvalidError("Invalid config data type")
-
-    return result
@@ -1,20 +1,24 @@
+from collections.abc import Sequence
+
 from nb_cli.compat import model_dump
 
+from .registry import TEXT_INDEX
 from .store import Driver, load_module_data, load_unpublished_modules
 
 
 async def list_drivers(
     query: str | None = None, include_unpublished: bool = False
-) -> list[Driver]:
+) -> Sequence[Driver]:
     drivers = await load_module_data("driver")
     if include_unpublished:
         drivers = drivers + await load_unpublished_modules(Driver)
     if query is None:
         return drivers
 
+    # index narrows down the candidates case-insensitively
     return [
         driver
-        for driver in drivers
+        for driver in drivers.search(query, TEXT_INDEX)
         if any(
             query in value
             for value in model_dump(
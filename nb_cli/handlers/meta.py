@@ -1,23 +1,39 @@
 import asyncio
-from collections.abc import Callable, Coroutine
+from collections.abc import Callable, Coroutine, Iterable
+import contextlib
 from functools import wraps
 import json
+import os
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, TypeVar, cast
+import secrets
+import shutil
+from typing import TYPE_CHECKING, Any, TypedDict, TypeVar, cast
 from typing_extensions import ParamSpec
 
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+
 from nb_cli import _, cache
 from nb_cli.config import (
     GLOBAL_CONFIG,
     ConfigManager,
     LegacyNoneBotConfig,
     NoneBotConfig,
+    PackageInfo,
 )
 from nb_cli.consts import REQUIRES_PYTHON, WINDOWS
-from nb_cli.exceptions import NoneBotError, PipError, PythonInterpreterError
+from nb_cli.profiling import profiled
+from nb_cli.exceptions import (
+    NoneBotError,
+    PipError,
+    ProcessExecutionError,
+    PythonInterpreterError,
+)
 
 from . import templates
-from .process import create_process, create_process_shell
+from .data import CACHE_DIR
+from .probe import run_probe
+from .process import create_process
 
 R = TypeVar("R")
 P = ParamSpec("P")
@@ -25,6 +41,9 @@ P = ParamSpec("P")
 DEFAULT_PYTHON = ("python3", "python")
 WINDOWS_DEFAULT_PYTHON = ("python",)
 
+INTERPRETER_CACHE_FILE = CACHE_DIR / "interpreters.json"
+"""Persistent cache of interpreter facts, validated by file fingerprints."""
+
 _LOGO = """
 d8b   db  .d88b.  d8b   db d88888b d8888b.  .d88b.  d888888b
 888o  88 .8P  Y8. 888o  88 88'     88  `8D .8P  Y8. `~~88~~'
@@ -64,6 +83,97 @@ def requires_project_root(
     return wrapper
 
 
+def fingerprint_paths(paths: Iterable[str]) -> dict[str, list[int] | None]:
+    """Get the mtime and inode of paths, `None` for missing ones."""
+    result: dict[str, list[int] | None] = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            result[path] = None
+        else:
+            result[path] = [stat.st_mtime_ns, stat.st_ino]
+    return result
+
+
+def load_interpreter_cache() -> dict[str, Any]:
+    """Load the persisted interpreter facts, empty if unavailable."""
+    try:
+        return json.loads(INTERPRETER_CACHE_FILE.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def update_interpreter_cache(updater: Callable[[dict[str, Any]], None]) -> None:
+    """Modify the persisted interpreter facts with `updater` and save them."""
+    data = load_interpreter_cache()
+    updater(data)
+    tmpfile = INTERPRETER_CACHE_FILE.with_name(
+        f"{INTERPRETER_CACHE_FILE.name}.{secrets.token_hex(4)}.tmp"
+    )
+    try:
+        tmpfile.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmpfile, INTERPRETER_CACHE_FILE)
+    except Exception:
+        pass  # persistent cache is best effort
+    finally:
+        tmpfile.unlink(missing_ok=True)
+
+
+def _get_cached_env_python() -> str | None:
+    entry = load_interpreter_cache().get("env_python")
+    if (
+        entry
+        and entry["PATH"] == os.environ.get("PATH", "")
+        # new interpreters in PATH change the mtime of directories
+        and fingerprint_paths(entry["fingerprint"]) == entry["fingerprint"]
+    ):
+        return entry["executable"]
+    return None
+
+
+def _set_cached_env_python(executable: str) -> None:
+    path = os.environ.get("PATH", "")
+    fingerprint = fingerprint_paths([executable, *filter(None, path.split(os.pathsep))])
+
+    def _update(data: dict[str, Any]) -> None:
+        data["env_python"] = {
+            "PATH": path,
+            "executable": executable,
+            "fingerprint": fingerprint,
+        }
+
+    update_interpreter_cache(_update)
+
+
+def _get_cached_interpreter_info(python_path: str) -> "InterpreterInfo | None":
+    entry = load_interpreter_cache().get("interpreters", {}).get(python_path)
+    if (
+        entry
+        and set(PROBED_PACKAGES) <= set(entry["info"]["packages"])
+        and entry.get("PYTHONPATH") == os.environ.get("PYTHONPATH", "")
+        # installing or removing packages changes the mtime of site-packages
+        and fingerprint_paths(entry["fingerprint"]) == entry["fingerprint"]
+    ):
+        return entry["info"]
+    return None
+
+
+def _set_cached_interpreter_info(python_path: str, info: "InterpreterInfo") -> None:
+    if not os.path.isabs(python_path):
+        return  # commands looked up in PATH cannot be fingerprinted
+    fingerprint = fingerprint_paths([python_path, *info["site_packages"]])
+
+    def _update(data: dict[str, Any]) -> None:
+        data.setdefault("interpreters", {})[python_path] = {
+            "PYTHONPATH": os.environ.get("PYTHONPATH", ""),
+            "fingerprint": fingerprint,
+            "info": info,
+        }
+
+    update_interpreter_cache(_update)
+
+
 if TYPE_CHECKING:
 
     async def _get_env_python() -> str: ...
@@ -71,29 +181,105 @@ if TYPE_CHECKING:
 else:
 
     @cache(ttl=None)
+    @profiled("meta.get_env_python")
     async def _get_env_python() -> str:
-        python_to_try = WINDOWS_DEFAULT_PYTHON if WINDOWS else DEFAULT_PYTHON
-
-        stdout, stderr = None, None
-
-        for python in python_to_try:
-            proc = await create_process_shell(
-                f"{python} -W ignore -c "
-                '"import sys, json; print(json.dumps(sys.executable))"',
-                stdout=asyncio.subprocess.PIPE,
-            )
-            stdout, stderr = await proc.communicate()
-            if proc.returncode == 0:
-                try:
-                    if executable := json.loads(stdout.splitlines()[-1].strip()):
-                        return executable
-                except Exception:
-                    continue
-        raise PythonInterpreterError(
-            _("Cannot find a valid Python interpreter.")
-            + (f"\nstdout:\n{stdout}" if stdout else "")
-            + (f"\nstderr:\n{stderr}" if stderr else "")
-        )
+        if (executable := _get_cached_env_python()) is not None:
+            return executable
+
+        executable = await _find_env_python()
+        _set_cached_env_python(executable)
+        return executable
+
+
+def _read_pyvenv_home(cfg: Path) -> str | None:
+    try:
+        for line in cfg.read_text(encoding="utf-8").splitlines():
+            key, sep, value = line.partition("=")
+            if sep and key.strip().lower() == "home":
+                return value.strip()
+    except OSError:
+        pass
+    return None
+
+
+def _is_static_python(path: str) -> bool:
+    """Check if `sys.executable` of a resolved interpreter is known without running it.
+
+    Launchers (e.g. pyenv shims or Windows app execution aliases) pick another
+    interpreter at runtime, and a virtual environment is broken without its
+    base interpreter. Such interpreters have to be started to tell.
+    """
+    real = os.path.realpath(path)
+    try:
+        if not os.access(real, os.X_OK) or os.path.getsize(real) == 0:
+            return False
+        with open(real, "rb") as f:
+            if f.read(2) == b"#!":
+                return False
+    except OSError:
+        return False
+
+    executable = Path(path)
+    for cfg in (
+        executable.parent / "pyvenv.cfg",
+        executable.parent.parent / "pyvenv.cfg",
+    ):
+        if cfg.is_file():
+            home = _read_pyvenv_home(cfg)
+            return home is not None and Path(home).is_dir()
+    return True
+
+
+async def _run_env_python(path: str) -> tuple[str | None, bytes, bytes]:
+    proc = await create_process(
+        path,
+        "-W",
+        "ignore",
+        "-c",
+        "import sys, json; print(json.dumps(sys.executable))",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode == 0:
+        with contextlib.suppress(Exception):
+            return json.loads(stdout.splitlines()[-1].strip()) or None, stdout, stderr
+    return None, stdout, stderr
+
+
+async def _find_env_python() -> str:
+    """Find the interpreter in PATH without starting a shell.
+
+    Candidates are resolved statically if possible. Ambiguous ones which are
+    preferred over the first static candidate are started concurrently.
+    """
+    python_to_try = WINDOWS_DEFAULT_PYTHON if WINDOWS else DEFAULT_PYTHON
+
+    candidates: list[tuple[str, bool]] = []
+    for python in python_to_try:
+        if (path := shutil.which(python)) is None:
+            continue
+        path = os.path.abspath(path)
+        candidates.append((path, static := _is_static_python(path)))
+        if static:
+            break
+
+    results = await asyncio.gather(
+        *(_run_env_python(path) for path, static in candidates if not static)
+    )
+    stdout, stderr = None, None
+    ambiguous = iter(results)
+    for path, static in candidates:
+        if static:
+            return path
+        executable, stdout, stderr = next(ambiguous)
+        if executable:
+            return executable
+    raise PythonInterpreterError(
+        _("Cannot find a valid Python interpreter.")
+        + (f"\nstdout:\n{stdout}" if stdout else "")
+        + (f"\nstderr:\n{stderr}" if stderr else "")
+    )
 
 
 async def get_default_python(cwd: Path | None = None) -> str:
@@ -104,46 +290,64 @@ async def get_default_python(cwd: Path | None = None) -> str:
     return await _get_env_python()
 
 
+class InterpreterInfo(TypedDict):
+    executable: str
+    version: dict[str, int]
+    packages: dict[str, str | None]
+    site_packages: list[str]
+
+
+PROBED_PACKAGES = ("nonebot2", "pip")
+"""Packages whose installed versions are collected by the interpreter probe."""
+
+
 if TYPE_CHECKING:
 
-    async def get_python_version(
+    async def get_interpreter_info(
         python_path: str | None = None, cwd: Path | None = None
-    ) -> dict[str, int]: ...
+    ) -> InterpreterInfo: ...
 
 else:
 
     @cache(ttl=None)
-    async def get_python_version(
+    @profiled("meta.get_interpreter_info")
+    async def get_interpreter_info(
         python_path: str | None = None, cwd: Path | None = None
-    ) -> dict[str, int]:
+    ) -> InterpreterInfo:
+        """Collect the facts of an interpreter with a single probe process.
+
+        The result contains the Python version, `sys.executable`, the installed
+        versions of `PROBED_PACKAGES` and the site-packages paths.
+        """
         if python_path is None:
             python_path = await get_default_python(cwd)
+        if (info := _get_cached_interpreter_info(python_path)) is not None:
+            return info
 
-        t = templates.get_template("meta/python_version.py.jinja")
-        proc = await create_process(
-            python_path,
-            "-W",
-            "ignore",
-            "-c",
-            await t.render_async(),
-            stdout=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await proc.communicate()
-        if proc.returncode != 0:
-            raise PythonInterpreterError(
-                _("Failed to get Python version.")
-                + _("Exit code {code}").format(code=proc.returncode)
-                + (f"\nstdout:\n{stdout}" if stdout else "")
-                + (f"\nstderr:\n{stderr}" if stderr else "")
+        t = templates.get_template("meta/interpreter_info.py.jinja")
+        try:
+            stdout = await run_probe(
+                python_path, await t.render_async(packages=PROBED_PACKAGES)
             )
+        except ProcessExecutionError as e:
+            raise PythonInterpreterError(
+                _("Failed to probe Python interpreter.") + f"\n{e}"
+            ) from e
         try:
-            return json.loads(stdout.splitlines()[-1].strip())
+            info = json.loads(stdout.splitlines()[-1].strip())
         except Exception as e:
             raise PythonInterpreterError(
-                _("Failed to get Python version.")
+                _("Failed to probe Python interpreter.")
                 + (f"\nstdout:\n{stdout}" if stdout else "")
-                + (f"\nstderr:\n{stderr}" if stderr else "")
             ) from e
+        _set_cached_interpreter_info(python_path, info)
+        return info
+
+
+async def get_python_version(
+    python_path: str | None = None, cwd: Path | None = None
+) -> dict[str, int]:
+    return (await get_interpreter_info(python_path, cwd))["version"]
 
 
 def requires_python(
@@ -167,46 +371,10 @@ def requires_python(
     return wrapper
 
 
-if TYPE_CHECKING:
-
-    async def get_nonebot_version(
-        python_path: str | None = None, cwd: Path | None = None
-    ) -> str: ...
-
-else:
-
-    @cache(ttl=None)
-    async def get_nonebot_version(
-        python_path: str | None = None, cwd: Path | None = None
-    ) -> str:
-        if python_path is None:
-            python_path = await get_default_python(cwd)
-
-        t = templates.get_template("meta/nonebot_version.py.jinja")
-        proc = await create_process(
-            python_path,
-            "-W",
-            "ignore",
-            "-c",
-            await t.render_async(),
-            stdout=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await proc.communicate()
-        if proc.returncode != 0:
-            raise NoneBotError(
-                _("Failed to get NoneBot version.")
-                + _("Exit code {code}").format(code=proc.returncode)
-                + (f"\nstdout:\n{stdout}" if stdout else "")
-                + (f"\nstderr:\n{stderr}" if stderr else "")
-            )
-        try:
-            return json.loads(stdout.splitlines()[-1].strip())
-        except Exception as e:
-            raise NoneBotError(
-                _("Failed to get NoneBot version.")
-                + (f"\nstdout:\n{stdout}" if stdout else "")
-                + (f"\nstderr:\n{stderr}" if stderr else "")
-            ) from e
+async def get_nonebot_version(
+    python_path: str | None = None, cwd: Path | None = None
+) -> str | None:
+    return (await get_interpreter_info(python_path, cwd))["packages"]["nonebot2"]
 
 
 def requires_nonebot(
@@ -226,46 +394,10 @@ def requires_nonebot(
     return wrapper
 
 
-if TYPE_CHECKING:
-
-    async def get_pip_version(
-        python_path: str | None = None, cwd: Path | None = None
-    ) -> str: ...
-
-else:
-
-    @cache(ttl=None)
-    async def get_pip_version(
-        python_path: str | None = None, cwd: Path | None = None
-    ) -> str:
-        if python_path is None:
-            python_path = await get_default_python(cwd)
-
-        t = templates.get_template("meta/pip_version.py.jinja")
-        proc = await create_process(
-            python_path,
-            "-W",
-            "ignore",
-            "-c",
-            await t.render_async(),
-            stdout=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await proc.communicate()
-        if proc.returncode != 0:
-            raise PipError(
-                _("Failed to get pip version.")
-                + _("Exit code {code}").format(code=proc.returncode)
-                + (f"\nstdout:\n{stdout}" if stdout else "")
-                + (f"\nstderr:\n{stderr}" if stderr else "")
-            )
-        try:
-            return json.loads(stdout.splitlines()[-1].strip())
-        except Exception as e:
-            raise PipError(
-                _("Failed to get pip version.")
-                + (f"\nstdout:\n{stdout}" if stdout else "")
-                + (f"\nstderr:\n{stderr}" if stderr else "")
-            ) from e
+async def get_pip_version(
+    python_path: str | None = None, cwd: Path | None = None
+) -> str | None:
+    return (await get_interpreter_info(python_path, cwd))["packages"]["pip"]
 
 
 def requires_pip(
@@ -283,3 +415,104 @@ def requires_pip(
         raise PipError(_("pip is not installed."))
 
     return wrapper
+
+
+class InstalledDistribution(TypedDict):
+    version: str | None
+    location: str | None
+    satisfied: bool
+
+
+@profiled("meta.get_installed_distributions")
+async def get_installed_distributions(
+    requirements: Iterable[Requirement],
+    *,
+    python_path: str | None = None,
+    cwd: Path | None = None,
+) -> dict[str, InstalledDistribution]:
+    """Query the installed distributions of requirements in one probe process.
+
+    Results are persisted per interpreter and reused until its site-packages
+    change, so only unknown distributions are probed.
+
+    Returns:
+        Installed version, location and whether the requirement is satisfied,
+        keyed by requirement name. Environment markers are not evaluated.
+    """
+    requirements = list(requirements)
+    if python_path is None:
+        python_path = await get_default_python(cwd)
+    info = await get_interpreter_info(python_path, cwd)
+    fingerprint = fingerprint_paths([python_path, *info["site_packages"]])
+
+    entry = load_interpreter_cache().get("distributions", {}).get(python_path)
+    known: dict[str, dict[str, str] | None] = (
+        entry["dists"] if entry and entry["fingerprint"] == fingerprint else {}
+    )
+    if missing := {canonicalize_name(r.name) for r in requirements} - known.keys():
+        t = templates.get_template("meta/installed_distributions.py.jinja")
+        stdout = ""
+        try:
+            stdout = await run_probe(
+                python_path, await t.render_async(names=sorted(missing))
+            )
+            known.update(json.loads(stdout.splitlines()[-1].strip()))
+        except Exception as e:
+            raise PythonInterpreterError(
+                _("Failed to query installed distributions.")
+                + (f"\n{e}" if isinstance(e, ProcessExecutionError) else "")
+                + (f"\nstdout:\n{stdout}" if stdout else "")
+            ) from e
+
+        if os.path.isabs(python_path):
+
+            def _update(data: dict[str, Any]) -> None:
+                data.setdefault("distributions", {})[python_path] = {
+                    "fingerprint": fingerprint,
+                    "dists": known,
+                }
+
+            update_interpreter_cache(_update)
+
+    result: dict[str, InstalledDistribution] = {}
+    for requirement in requirements:
+        dist = known.get(canonicalize_name(requirement.name))
+        version = dist["version"] if dist else None
+        result[requirement.name] = {
+            "version": version,
+            "location": dist["location"] if dist else None,
+            "satisfied": version is not None
+            and requirement.specifier.contains(version, prereleases=True),
+        }
+    return result
+
+
+async def get_package_install_states(
+    packages: Iterable[PackageInfo],
+    *,
+    python_path: str | None = None,
+    cwd: Path | None = None,
+) -> dict[str, InstalledDistribution]:
+    """Check the install states of packages against the project dependencies.
+
+    Returns:
+        Install states keyed by project link.
+    """
+    dependencies = {
+        canonicalize_name(r.name): r for r in get_config_manager(cwd).get_dependencies()
+    }
+    requirements: dict[str, Requirement] = {}
+    for package in packages:
+        with contextlib.suppress(InvalidRequirement):
+            requirement = Requirement(package.project_link)
+            requirements[package.project_link] = dependencies.get(
+                canonicalize_name(requirement.name), requirement
+            )
+
+    distributions = await get_installed_distributions(
+        requirements.values(), python_path=python_path, cwd=cwd
+    )
+    return {
+        link: distributions[requirement.name]
+        for link, requirement in requirements.items()
+    }
@@ -0,0 +1,222 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+import contextlib
+import json
+import os
+import time
+from typing import TypeVar
+
+import click
+
+from nb_cli import _
+from nb_cli.config import GLOBAL_CONFIG
+from nb_cli.exceptions import ModuleLoadFailed, ProjectNotFoundError
+
+from .data import CACHE_DIR
+
+_T = TypeVar("_T")
+
+DEFAULT_MIRRORS = (
+    "https://registry.nonebot.dev/{module_name}.json",
+    "https://cdn.jsdelivr.net/gh/nonebot/registry@results/{module_name}.json",
+    "https://cdn.staticaly.com/gh/nonebot/registry@results/{module_name}.json",
+    "https://jsd.cdn.zzko.cn/gh/nonebot/registry@results/{module_name}.json",
+    "https://mirror.ghproxy.com/https://raw.githubusercontent.com/nonebot/registry/results/{module_name}.json",
+    "https://gh-proxy.com/https://raw.githubusercontent.com/nonebot/registry/results/{module_name}.json",
+)
+
+RACE_WIDTH = int(os.getenv("NB_CLI_MIRROR_RACE_WIDTH", "2"))
+"""Number of best ranked mirrors requested at once."""
+
+SCOREBOARD_FILE = CACHE_DIR / "mirrors.json"
+
+# latency prior for mirrors without history, in seconds
+_DEFAULT_LATENCY = 1.0
+_MIN_HEDGE_DELAY = 0.1
+_MAX_HEDGE_DELAY = 5.0
+# weight of the newest sample in smoothed statistics
+_ALPHA = 0.25
+_BETA = 0.25
+# old success / failure counts fade out so that recovered mirrors get a chance
+_DECAY = 0.9
+
+
+def _expand_mirror(mirror: str) -> str:
+    mirror = mirror.strip()
+    if "{module_name}" in mirror:
+        return mirror
+    return mirror.rstrip("/") + "/{module_name}.json"
+
+
+_config_warned = False
+
+
+def get_mirrors() -> list[str]:
+    """Get the registry mirror url templates.
+
+    Custom mirrors set in the `NB_CLI_REGISTRY_MIRRORS` environment variable
+    (separated by whitespaces or commas), then those in `registry-mirrors` of
+    the `[tool.nb-cli]` table of the project come before the default ones.
+    A custom mirror may either be a url template containing `{module_name}`
+    or a base url which `{module_name}.json` is appended to.
+    """
+    global _config_warned
+
+    custom = os.getenv("NB_CLI_REGISTRY_MIRRORS", "").replace(",", " ").split()
+    try:
+        custom.extend(GLOBAL_CONFIG.get_registry_mirrors())
+    except ProjectNotFoundError:
+        pass  # project config is optional
+    except Exception as e:
+        # a broken config must not break the store commands
+        if not _config_warned:
+            _config_warned = True
+            click.secho(
+                _(
+                    "WARNING: Failed to read registry mirrors from project config: {e}"
+                ).format(e=e),
+                fg="yellow",
+            )
+    return list(dict.fromkeys([*map(_expand_mirror, custom), *DEFAULT_MIRRORS]))
+
+
+class MirrorScoreboard:
+    """Persisted success rate and latency statistics of registry mirrors."""
+
+    def __init__(self, stats: dict[str, dict[str, float]] | None = None) -> None:
+        self.stats: dict[str, dict[str, float]] = stats or {}
+
+    @classmethod
+    def load(cls) -> "MirrorScoreboard":
+        try:
+            return cls(json.loads(SCOREBOARD_FILE.read_text(encoding="utf-8")))
+        except Exception:
+            return cls()
+
+    def dump(self) -> None:
+        with contextlib.suppress(Exception):  # statistics are best effort
+            SCOREBOARD_FILE.write_text(json.dumps(self.stats), encoding="utf-8")
+
+    def success_rate(self, mirror: str) -> float:
+        stat = self.stats.get(mirror, {})
+        success, failure = stat.get("success", 0.0), stat.get("failure", 0.0)
+        return (success + 1) / (success + failure + 2)
+
+    def latency(self, mirror: str) -> float:
+        return self.stats.get(mirror, {}).get("latency", _DEFAULT_LATENCY)
+
+    def score(self, mirror: str) -> float:
+        """Expected cost of a mirror, lower is better."""
+        return self.latency(mirror) / self.success_rate(mirror)
+
+    def rank(self, mirrors: Sequence[str]) -> list[str]:
+        # sorting is stable, so mirrors without history keep the given order
+        return sorted(mirrors, key=self.score)
+
+    def hedge_delay(self, mirror: str) -> float:
+        """Time to wait for a mirror before asking the next one."""
+        stat = self.stats.get(mirror)
+        if stat is None or "latency" not in stat:
+            return _DEFAULT_LATENCY
+        delay = stat["latency"] + 4 * stat.get("deviation", 0.0)
+        return min(max(delay, _MIN_HEDGE_DELAY), _MAX_HEDGE_DELAY)
+
+    def record_lost(self, mirror: str, elapsed: float) -> None:
+        """Record an attempt cancelled after another mirror answered.
+
+        A mirror which did not answer within the time the winner took counts
+        as failed, so that hanging mirrors do not keep their prior and stay on
+        top. Its latency is only known to be at least `elapsed`.
+        """
+        self.record(mirror, None)
+        stat = self.stats[mirror]
+        if "latency" in stat and stat["latency"] < elapsed:
+            stat["latency"] = (1 - _ALPHA) * stat["latency"] + _ALPHA * elapsed
+
+    def record(self, mirror: str, latency: float | None) -> None:
+        """Record a finished request. `latency` is `None` on failure."""
+        stat = self.stats.setdefault(mirror, {})
+        stat["success"] = stat.get("success", 0.0) * _DECAY
+        stat["failure"] = stat.get("failure", 0.0) * _DECAY
+        if latency is None:
+            stat["failure"] += 1
+            return
+        stat["success"] += 1
+        if "latency" not in stat:
+            stat["latency"] = latency
+            stat["deviation"] = latency / 2
+        else:
+            stat["deviation"] = (1 - _BETA) * stat.get("deviation", 0.0) + _BETA * abs(
+                stat["latency"] - latency
+            )
+            stat["latency"] = (1 - _ALPHA) * stat["latency"] + _ALPHA * latency
+
+
+_scoreboard: MirrorScoreboard | None = None
+
+
+def get_scoreboard() -> MirrorScoreboard:
+    global _scoreboard
+
+    if _scoreboard is None:
+        _scoreboard = MirrorScoreboard.load()
+    return _scoreboard
+
+
+async def race_mirrors(
+    mirrors: Sequence[str], attempt: Callable[[str], Awaitable[_T]]
+) -> _T:
+    """Run `attempt` against the best ranked mirrors and return the first success.
+
+    The top `RACE_WIDTH` mirrors are tried at once. Another mirror is added
+    when a running attempt fails, or when none finishes within the hedge delay
+    learned from the history of the best mirror. Losing attempts are cancelled
+    and recorded as lost.
+
+    Raises:
+        ModuleLoadFailed: If all mirrors failed.
+    """
+    board = get_scoreboard()
+    queue = board.rank(mirrors)
+    delay = board.hedge_delay(queue[0]) if queue else _DEFAULT_LATENCY
+    pending: dict[asyncio.Task[_T], tuple[str, float]] = {}
+    exceptions: list[BaseException] = []
+    winner_latency: float | None = None
+
+    def _launch() -> None:
+        mirror = queue.pop(0)
+        pending[asyncio.create_task(attempt(mirror))] = (mirror, time.perf_counter())
+
+    for __ in range(min(max(RACE_WIDTH, 1), len(queue))):
+        _launch()
+
+    try:
+        while pending:
+            done, __ = await asyncio.wait(
+                pending,
+                timeout=delay if queue else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:  # hedge with the next mirror
+                _launch()
+                continue
+            for task in done:
+                mirror, started = pending.pop(task)
+                if (exc := task.exception()) is None:
+                    winner_latency = time.perf_counter() - started
+                    board.record(mirror, winner_latency)
+                    return task.result()
+                board.record(mirror, None)
+                exceptions.append(exc)
+                if queue:
+                    _launch()
+        raise ModuleLoadFailed(_("All registry mirrors failed."), exceptions)
+    finally:
+        now = time.perf_counter()
+        for task, (mirror, started) in pending.items():
+            # hedges launched shortly before the win tell nothing about mirrors
+            if winner_latency is not None and now - started >= winner_latency:
+                board.record_lost(mirror, now - started)
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        board.dump()
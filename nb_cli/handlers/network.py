@@ -0,0 +1,63 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from importlib.util import find_spec
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+
+# HTTP/2 requires the optional `httpx[http2]` extra
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+CONNECT_TIMEOUT = float(os.getenv("NB_CLI_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("NB_CLI_READ_TIMEOUT", "15"))
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("NB_CLI_MAX_CONNECTIONS_PER_HOST", "4"))
+KEEPALIVE_EXPIRY = 30.0
+
+# httpx is imported with the first request, it is slow to import
+_client: "httpx.AsyncClient | None" = None
+_host_limits: dict[str, asyncio.Semaphore] = {}
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """Get the process-wide pooled HTTP client, creating it if needed."""
+    global _client
+
+    import httpx
+
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(keepalive_expiry=KEEPALIVE_EXPIRY),
+            follow_redirects=True,
+        )
+    return _client
+
+
+@asynccontextmanager
+async def http_stream(
+    url: str, headers: dict[str, str] | None = None
+) -> AsyncIterator["httpx.Response"]:
+    """Send a GET request through the shared client without reading the body.
+
+    The per-host limit is held until the response is closed.
+    """
+    import httpx
+
+    host = httpx.URL(url).host
+    limit = _host_limits.setdefault(host, asyncio.Semaphore(MAX_CONNECTIONS_PER_HOST))
+    async with limit, get_http_client().stream("GET", url, headers=headers) as resp:
+        yield resp
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and release all pooled connections."""
+    global _client
+
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
+    _host_limits.clear()
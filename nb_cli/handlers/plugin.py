@@ -1,8 +1,7 @@
-import asyncio
+from collections.abc import Sequence
 import json
 from pathlib import Path
 
-from cookiecutter.main import cookiecutter
 
 from nb_cli.compat import model_dump
 from nb_cli.config import LegacyNoneBotConfig, NoneBotConfig, Plugin
@@ -15,7 +14,8 @@ from .meta import (
     requires_nonebot,
     requires_project_root,
 )
-from .process import create_process
+from .probe import run_probe
+from .registry import TEXT_INDEX, RegistryView
 from .store import load_module_data, load_unpublished_modules
 
 TEMPLATE_ROOT = Path(__file__).parent.parent / "template" / "plugin"
@@ -27,16 +27,7 @@ async def list_builtin_plugins(*, python_path: str | None = None) -> list[str]:
         python_path = await get_default_python()
 
     t = templates.get_template("plugin/list_builtin_plugin.py.jinja")
-
-    proc = await create_process(
-        python_path,
-        "-W",
-        "ignore",
-        "-c",
-        await t.render_async(),
-        stdout=asyncio.subprocess.PIPE,
-    )
-    stdout, _ = await proc.communicate()
+    stdout = await run_probe(python_path, await t.render_async())
     return json.loads(stdout.strip())
 
 
@@ -46,6 +37,8 @@ def create_plugin(
     sub_plugin: bool = False,
     template: str | None = None,
 ):
+    from cookiecutter.main import cookiecutter
+
     cookiecutter(
         str(TEMPLATE_ROOT.resolve()) if template is None else template,
         no_input=True,
@@ -56,16 +49,17 @@ def create_plugin(
 
 async def list_plugins(
     query: str | None = None, include_unpublished: bool = False
-) -> list[Plugin]:
+) -> Sequence[Plugin]:
     plugins = await load_module_data("plugin")
     if include_unpublished:
         plugins = plugins + await load_unpublished_modules(Plugin)
     if query is None:
         return plugins
 
+    # index narrows down the candidates case-insensitively
     return [
         plugin
-        for plugin in plugins
+        for plugin in plugins.search(query, TEXT_INDEX)
         if any(
             query in value
             for value in model_dump(
@@ -76,11 +70,20 @@ async def list_plugins(
 
 
 @requires_project_root
-async def list_installed_plugins(*, cwd: Path | None = None) -> list[Plugin]:
-    config_data = get_nonebot_config(cwd)
-    plugins = await load_module_data("plugin") + await load_unpublished_modules(Plugin)
+async def list_installed_plugins(
+    *, cwd: Path | None = None, registry: RegistryView[Plugin] | None = None
+) -> list[Plugin]:
+    """List the plugins used by the project.
 
-    result: list[Plugin] = []
+    `registry` (published and unpublished plugins) can be given to share one
+    registry load when listing several projects.
+    """
+    config_data = get_nonebot_config(cwd)
+    plugins = (
+        registry
+        if registry is not None
+        else await load_module_data("plugin") + await load_unpublished_modules(Plugin)
+    )
 
     if isinstance(config_data, NoneBotConfig):
         plugin_info = config_data.plugins
@@ -89,16 +92,10 @@ async def list_installed_plugins(*, cwd: Path | None = None) -> list[Plugin]:
             for pkg_name, module_names in plugin_info.items()
             for module_name in module_names
         }
-        for plugin in plugins:
-            if (plugin.project_link, plugin.module_name) in allowed_plugins:
-                result.append(plugin)
+        return plugins.lookup_many(("project_link", "module_name"), allowed_plugins)
     elif isinstance(config_data, LegacyNoneBotConfig):
         plugin_info = config_data.plugins
         allowed_plugins = set(plugin_info)
-        for plugin in plugins:
-            if plugin.module_name in allowed_plugins:
-                result.append(plugin)
+        return plugins.lookup_many("module_name", allowed_plugins)
     else:
         raise ProjectInvalidError("Invalid config data type")
-
-    return result
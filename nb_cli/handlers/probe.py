@@ -0,0 +1,183 @@
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+from typing import Any
+
+from nb_cli import _
+from nb_cli.exceptions import ProbeServerError, ProcessExecutionError
+from nb_cli.profiling import profiled
+
+from .process import create_process
+
+PROBE_SERVER_ENABLED = os.getenv("NB_CLI_PROBE_SERVER", "1").lower() not in {
+    "0",
+    "false",
+}
+"""Set `NB_CLI_PROBE_SERVER=0` to start a new interpreter for every probe."""
+PROBE_IDLE_TIMEOUT = float(os.getenv("NB_CLI_PROBE_IDLE_TIMEOUT", "60"))
+"""Seconds after which an idle probe server is shut down."""
+
+_STOP_TIMEOUT = 3.0
+
+
+class ProbeServer:
+    """A long-lived interpreter answering probe requests over a pipe.
+
+    Requests and responses are JSON-RPC 2.0 messages, one per line. The
+    process is started on the first request and stopped when it has been
+    idle for `PROBE_IDLE_TIMEOUT` seconds. Requests are sent one at a time.
+    """
+
+    def __init__(self, python_path: str) -> None:
+        self.python_path = python_path
+        self.loop = asyncio.get_running_loop()
+        self._proc: asyncio.subprocess.Process | None = None
+        self._lock = asyncio.Lock()
+        self._ids = itertools.count()
+        self._idle_handle: asyncio.TimerHandle | None = None
+
+    async def _start(self) -> asyncio.subprocess.Process:
+        from . import templates
+
+        t = templates.get_template("meta/probe_server.py.jinja")
+        # a daemon outliving commands, shut down by `stop_probe_servers`
+        # instead of the signal handling of `create_process`
+        return await asyncio.create_subprocess_exec(
+            self.python_path,
+            "-W",
+            "ignore",
+            "-c",
+            await t.render_async(),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+        )
+
+    def _close(self) -> asyncio.subprocess.Process | None:
+        """Close the pipe, which makes the server exit on its own."""
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.stdin is not None:
+            proc.stdin.close()
+        return proc
+
+    def _kill(self) -> None:
+        # the stream may be out of sync, do not wait for a graceful exit
+        if (proc := self._close()) is not None and proc.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                proc.kill()
+
+    async def call(self, method: str, **params: Any) -> Any:
+        """Send a request and wait for its result.
+
+        Raises:
+            ProbeServerError: If the server failed to answer.
+            ProcessExecutionError: If the request failed in the server.
+        """
+        async with self._lock:
+            if self._idle_handle is not None:
+                self._idle_handle.cancel()
+                self._idle_handle = None
+            try:
+                if self._proc is None or self._proc.returncode is not None:
+                    self._proc = await self._start()
+                proc = self._proc
+                assert proc.stdin is not None
+                assert proc.stdout is not None
+                request_id = next(self._ids)
+                request = {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "method": method,
+                    "params": params,
+                }
+                proc.stdin.write(json.dumps(request).encode() + b"\n")
+                await proc.stdin.drain()
+                response = json.loads(await proc.stdout.readline())
+                if response["id"] != request_id:
+                    raise ValueError(f"Unexpected response id {response['id']!r}")
+            except Exception as e:
+                self._kill()
+                raise ProbeServerError(_("Probe server stopped unexpectedly.")) from e
+            except BaseException:
+                self._kill()
+                raise
+
+            self._idle_handle = self.loop.call_later(PROBE_IDLE_TIMEOUT, self._close)
+            if "error" in response:
+                raise ProcessExecutionError(response["error"]["message"])
+            return response["result"]
+
+    async def stop(self) -> None:
+        """Stop the server and wait for it to exit."""
+        if (proc := self._close()) is None:
+            return
+        try:
+            await asyncio.wait_for(proc.wait(), _STOP_TIMEOUT)
+        except asyncio.TimeoutError:
+            with contextlib.suppress(ProcessLookupError):
+                proc.kill()
+
+
+_servers: dict[str, ProbeServer] = {}
+
+
+def get_probe_server(python_path: str) -> ProbeServer:
+    """Get the probe server of an interpreter in the running event loop."""
+    server = _servers.get(python_path)
+    if server is None or server.loop is not asyncio.get_running_loop():
+        if server is not None:
+            server._kill()
+        server = _servers[python_path] = ProbeServer(python_path)
+    return server
+
+
+async def stop_probe_servers() -> None:
+    """Stop all probe servers started by the current process.
+
+    Must be called before the event loop closes, the servers are not
+    terminated by signal handlers like other processes.
+    """
+    servers = list(_servers.values())
+    _servers.clear()
+    loop = asyncio.get_running_loop()
+    for server in servers:
+        if server.loop is not loop:
+            server._kill()
+    await asyncio.gather(*(s.stop() for s in servers if s.loop is loop))
+
+
+@profiled("run_probe")
+async def run_probe(python_path: str, source: str) -> str:
+    """Run a probe script in the interpreter and return what it prints.
+
+    The script runs in the warm probe server of the interpreter if enabled,
+    otherwise (or if the server fails) in a new interpreter process.
+
+    Raises:
+        ProcessExecutionError: If the script failed.
+    """
+    if PROBE_SERVER_ENABLED:
+        try:
+            return await get_probe_server(python_path).call("exec", source=source)
+        except ProbeServerError:
+            pass  # fallback to a one-off interpreter
+
+    proc = await create_process(
+        python_path,
+        "-W",
+        "ignore",
+        "-c",
+        source,
+        stdout=asyncio.subprocess.PIPE,
+    )
+    stdout, __ = await proc.communicate()
+    if proc.returncode != 0:
+        raise ProcessExecutionError(
+            _("Exit code {code}").format(code=proc.returncode)
+            + (f"\nstdout:\n{stdout.decode(errors='replace')}" if stdout else "")
+        )
+    return stdout.decode(errors="replace")
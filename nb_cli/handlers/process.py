@@ -6,10 +6,12 @@ import os
 from pathlib import Path
 import signal
 import subprocess
+import time
 from typing import IO, Any, Union
 from typing_extensions import ParamSpec
 
 from nb_cli.consts import WINDOWS
+from nb_cli.profiling import record, span
 
 from .signal import register_signal_handler, remove_signal_handler, shield_signals
 
@@ -36,9 +38,18 @@ def ensure_process_terminated(
 
         async def wait_for_finish():
             await proc.wait()
+            record(
+                "process",
+                started,
+                time.perf_counter_ns(),
+                program=args[0] if args else kwargs.get("command"),
+                returncode=proc.returncode,
+            )
             should_exit.set()
 
-        proc = await func(*args, **kwargs)
+        started = time.perf_counter_ns()
+        with span("create_process"):
+            proc = await func(*args, **kwargs)
 
         exit_task = asyncio.create_task(wait_for_exit())
         tasks.add(exit_task)
@@ -4,14 +4,11 @@ from pathlib import Path
 from typing import IO, Any, TypeVar
 
 import click
-from cookiecutter.main import cookiecutter
 
 from nb_cli import _
 from nb_cli.config import LegacyNoneBotConfig, NoneBotConfig, PackageInfo, SimpleInfo
 
 from . import templates
-from .adapter import list_adapters
-from .driver import list_drivers
 from .meta import (
     get_config_manager,
     get_default_python,
@@ -20,8 +17,8 @@ from .meta import (
     requires_nonebot,
     requires_project_root,
 )
-from .plugin import list_plugins
 from .process import create_process
+from .store import load_module_data_batch
 
 TEMPLATE_ROOT = Path(__file__).parent.parent / "template" / "project"
 
@@ -41,6 +38,8 @@ def create_project(
     path = TEMPLATE_ROOT / project_template
     path = str(path.resolve()) if path.exists() else project_template
 
+    from cookiecutter.main import cookiecutter
+
     cookiecutter(
         path,
         no_input=no_input,
@@ -129,9 +128,12 @@ async def upgrade_project_format(*, cwd: Path | None = None) -> None:
         click.echo(_("Current format is already the new format."))
         return
 
-    all_adapters = _index_by_module_name(await list_adapters())
-    all_plugins = _index_by_module_name(await list_plugins())
-    nonebot_pkg = next(iter(await list_drivers("~none"))).model_copy()
+    module_data = await load_module_data_batch("adapter", "plugin", "driver")
+    all_adapters = _index_by_module_name(module_data["adapter"])
+    all_plugins = _index_by_module_name(module_data["plugin"])
+    nonebot_pkg = next(
+        d for d in module_data["driver"] if d.module_name == "~none"
+    ).model_copy()
     nonebot_pkg.project_link = "nonebot2"
 
     new_adapters: dict[str, list[SimpleInfo]] = {"@local": []}
@@ -175,8 +177,9 @@ async def upgrade_project_format(*, cwd: Path | None = None) -> None:
     )
 
     manager = get_config_manager(cwd)
-    manager.update_nonebot_config(new_config)
-    manager.add_dependency(nonebot_pkg, *packages)
+    with manager.transaction():
+        manager.update_nonebot_config(new_config)
+        manager.add_dependency(nonebot_pkg, *packages)
 
 
 @requires_project_root
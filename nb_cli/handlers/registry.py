@@ -0,0 +1,275 @@
+from collections.abc import Callable, Collection, Iterable, Iterator, Sequence
+from datetime import datetime
+import functools
+from typing import Any, Generic, TypeVar, overload
+
+from pydantic import BaseModel
+
+from nb_cli.compat import model_construct, model_fields
+from nb_cli.config import Adapter, Driver, Plugin
+from nb_cli.config.model import Tag
+
+T = TypeVar("T", Adapter, Plugin, Driver)
+
+IndexKey = str | tuple[str, ...]
+Index = dict[Any, list[int]]
+
+SUBSTRING_INDEX = "~substring"
+"""Key of the n-gram index for exact package name searching."""
+TEXT_INDEX = "~text"
+"""Key of the case-insensitive n-gram index for keyword searching."""
+AUTHOR_INDEX = "~author"
+"""Key of the case-insensitive n-gram index of authors."""
+TAG_INDEX = "~tag"
+"""Key of the index of lowercased tag labels."""
+NGRAM_INDEXES: dict[str, tuple[tuple[str, ...], bool]] = {
+    SUBSTRING_INDEX: (("name", "module_name", "project_link"), False),
+    TEXT_INDEX: (("project_link", "module_name", "name", "desc"), True),
+    AUTHOR_INDEX: (("author",), True),
+}
+"""Fields covered by each n-gram index, and whether they are lowercased."""
+MODULE_KEY = ("name", "module_name")
+"""Fields identifying a module in the registry."""
+INDEXED_KEYS: tuple[IndexKey, ...] = (
+    MODULE_KEY,
+    "name",
+    "module_name",
+    "project_link",
+    ("project_link", "module_name"),
+    TAG_INDEX,
+    *NGRAM_INDEXES,
+)
+"""Indexes which are built and persisted when the cache is written."""
+
+_NGRAM_SIZE = 3
+
+
+@functools.cache
+def record_fields(module_class: type[BaseModel]) -> tuple[str, ...]:
+    """Get the field names of the compact records of a module class."""
+    return tuple(field.name for field in model_fields(module_class))
+
+
+def _encode_value(field: str, value: Any) -> Any:
+    if field == "time":
+        return value.isoformat()
+    if field == "tags":
+        return [(tag.label, tag.color) for tag in value]
+    return value
+
+
+def _ngrams(text: str) -> set[str]:
+    return {text[i : i + _NGRAM_SIZE] for i in range(len(text) - _NGRAM_SIZE + 1)}
+
+
+def _concat_index(first: Index, second: Index, offset: int) -> Index:
+    index = dict(first)
+    for value, positions in second.items():
+        index[value] = [*index.get(value, ()), *(i + offset for i in positions)]
+    return index
+
+
+def encode_columns(module_class: type[T], modules: Sequence[T]) -> list[list[Any]]:
+    """Encode modules into compact columns of plain python values."""
+    return [
+        [_encode_value(field, getattr(module, field)) for module in modules]
+        for field in record_fields(module_class)
+    ]
+
+
+class RegistryView(Sequence[T], Generic[T]):
+    """A read-only sequence of registry modules which are built on access.
+
+    The records are kept as compact columns of plain values (see
+    `encode_columns`), and a model is only built when the record is accessed
+    for the first time. Key lookups work on the raw columns and only build
+    the models of matched records.
+
+    Indexes are built on first use, unless `index_source` provides a
+    prebuilt one (e.g. persisted along with the snapshot) for the key.
+    """
+
+    def __init__(
+        self,
+        module_class: type[T],
+        columns: list[list[Any]],
+        models: list[T | None] | None = None,
+        *,
+        index_source: Callable[[IndexKey], Index | None] | None = None,
+    ) -> None:
+        self.module_class = module_class
+        self.fields = record_fields(module_class)
+        self.columns = columns
+        self._count = len(columns[0]) if columns else 0
+        self._models: list[T | None] = (
+            models if models is not None else [None] * self._count
+        )
+        self._tags: dict[tuple[str, str], Tag] = {}
+        self._lowered: dict[str, list[str]] = {}
+        self._indexes: dict[IndexKey, Index] = {}
+        self._index_source = index_source
+
+    @classmethod
+    def from_models(
+        cls, module_class: type[T], modules: Sequence[T]
+    ) -> "RegistryView[T]":
+        if isinstance(modules, RegistryView):
+            return modules
+        modules = list(modules)
+        return cls(module_class, encode_columns(module_class, modules), [*modules])
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[T]: ...
+
+    def __getitem__(self, index: int | slice) -> T | list[T]:
+        if isinstance(index, slice):
+            return [self._build(i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("registry view index out of range")
+        return self._build(index)
+
+    def __iter__(self) -> Iterator[T]:
+        return map(self._build, range(self._count))
+
+    def __add__(self, other: Sequence[T]) -> "RegistryView[T]":
+        other = RegistryView.from_models(self.module_class, other)
+        return RegistryView(
+            self.module_class,
+            [a + b for a, b in zip(self.columns, other.columns)],
+            self._models + other._models,
+            # reuse the (maybe persisted) indexes of both sides
+            index_source=lambda key: _concat_index(
+                self.index(key), other.index(key), len(self)
+            ),
+        )
+
+    def __radd__(self, other: Sequence[T]) -> "RegistryView[T]":
+        return RegistryView.from_models(self.module_class, other) + self
+
+    def __repr__(self) -> str:
+        return f"<RegistryView of {self._count} {self.module_class.__name__}>"
+
+    def _tag(self, label: str, color: str) -> Tag:
+        # registry tags repeat a lot, share the same instances
+        if (tag := self._tags.get((label, color))) is None:
+            tag = self._tags[(label, color)] = model_construct(
+                Tag, label=label, color=color
+            )
+        return tag
+
+    def _build(self, index: int) -> T:
+        if (module := self._models[index]) is not None:
+            return module
+
+        values: dict[str, Any] = {}
+        for field, column in zip(self.fields, self.columns):
+            value = column[index]
+            if field == "time":
+                value = datetime.fromisoformat(value)
+            elif field == "tags":
+                value = [self._tag(label, color) for label, color in value]
+            values[field] = value
+        # records are validated before they are encoded
+        module = self._models[index] = model_construct(self.module_class, **values)
+        return module
+
+    def column(self, field: str) -> list[Any]:
+        """Get the raw values of a field without building any model."""
+        return self.columns[self.fields.index(field)]
+
+    def lowered_column(self, field: str) -> list[str]:
+        """Get the lowercased raw values of a string field."""
+        if (column := self._lowered.get(field)) is None:
+            column = self._lowered[field] = [v.lower() for v in self.column(field)]
+        return column
+
+    def _search_columns(self, key: str) -> list[list[str]]:
+        fields, lowered = NGRAM_INDEXES[key]
+        return [
+            self.lowered_column(field) if lowered else self.column(field)
+            for field in fields
+        ]
+
+    def index(self, key: IndexKey) -> Index:
+        """Get the index of `key`, which maps values to record positions."""
+        if (index := self._indexes.get(key)) is None:
+            if self._index_source is not None:
+                index = self._index_source(key)
+            if index is None:
+                index = self.build_index(key)
+            self._indexes[key] = index
+        return index
+
+    def build_index(self, key: IndexKey) -> Index:
+        """Build the index of `key` from the raw columns."""
+        index: Index = {}
+        if key in NGRAM_INDEXES:
+            for i, values in enumerate(zip(*self._search_columns(key))):
+                for gram in set().union(*map(_ngrams, values)):
+                    index.setdefault(gram, []).append(i)
+            return index
+        if key == TAG_INDEX:
+            for i, tags in enumerate(self.column("tags")):
+                for label in {label.lower() for label, __ in tags}:
+                    index.setdefault(label, []).append(i)
+            return index
+
+        values = (
+            self.column(key)
+            if isinstance(key, str)
+            else zip(*(self.column(field) for field in key))
+        )
+        for i, value in enumerate(values):
+            index.setdefault(value, []).append(i)
+        return index
+
+    def lookup_positions(self, key: IndexKey, value: Any) -> list[int]:
+        """Get the positions of records whose `key` equals to `value`."""
+        return self.index(key).get(value, [])
+
+    def lookup(self, key: IndexKey, value: Any) -> list[T]:
+        """Find the modules whose `key` field(s) equal to `value`.
+
+        `key` is either a field name or a tuple of field names, in which case
+        `value` is the tuple of the corresponding values.
+        """
+        return [self._build(i) for i in self.index(key).get(value, ())]
+
+    def lookup_many(self, key: IndexKey, values: Collection[Any]) -> list[T]:
+        """Find the modules whose `key` field(s) are in `values`, in registry order."""
+        index = self.index(key)
+        matched = sorted(i for value in values for i in index.get(value, ()))
+        return [self._build(i) for i in dict.fromkeys(matched)]
+
+    def lookup_any(self, keys: Iterable[IndexKey], value: Any) -> list[T]:
+        """Find the modules whose field of any of `keys` equals to `value`."""
+        matched = sorted(i for key in keys for i in self.index(key).get(value, ()))
+        return [self._build(i) for i in dict.fromkeys(matched)]
+
+    def search_positions(self, text: str, key: str = SUBSTRING_INDEX) -> list[int]:
+        """Get the positions of records whose fields of n-gram index `key`
+        contain `text`, in registry order.
+        """
+        if NGRAM_INDEXES[key][1]:
+            text = text.lower()
+        candidates: Iterable[int]
+        if len(text) < _NGRAM_SIZE:
+            candidates = range(self._count)
+        else:
+            index = self.index(key)
+            postings = sorted((index.get(gram, []) for gram in _ngrams(text)), key=len)
+            candidates = sorted(set(postings[0]).intersection(*postings[1:]))
+        columns = self._search_columns(key)
+        return [i for i in candidates if any(text in column[i] for column in columns)]
+
+    def search(self, text: str, key: str = SUBSTRING_INDEX) -> list[T]:
+        """Find the modules whose fields of n-gram index `key` contain `text`."""
+        return [self._build(i) for i in self.search_positions(text, key)]
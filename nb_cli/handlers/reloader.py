@@ -4,8 +4,6 @@ import logging
 from pathlib import Path
 from typing import Any
 
-from watchfiles import awatch
-
 from nb_cli import _
 
 from .signal import register_signal_handler, remove_signal_handler
@@ -91,6 +89,8 @@ class Reloader:
         self.watch_filter = file_filter or FileFilter()
         self.reload_delay = reload_delay
 
+        from watchfiles import awatch
+
         self.should_exit = asyncio.Event()
         self.watcher = awatch(
             *self.reload_dirs,
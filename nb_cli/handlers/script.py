@@ -1,5 +1,7 @@
 import asyncio
+import glob
 import json
+import os
 from pathlib import Path
 from typing import IO, Any
 
@@ -7,35 +9,71 @@ from nb_cli.config import SimpleInfo
 
 from . import templates
 from .meta import (
+    fingerprint_paths,
     get_default_python,
+    get_interpreter_info,
     get_nonebot_config,
     get_project_root,
+    load_interpreter_cache,
     requires_nonebot,
     requires_project_root,
     requires_python,
+    update_interpreter_cache,
 )
+from .probe import run_probe
 from .process import create_process
 
 
+_ENTRY_POINTS_PATTERNS = ("*.dist-info/entry_points.txt", "*.egg-info/entry_points.txt")
+
+
+def _entry_points_fingerprint(paths: list[str]) -> dict[str, list[int] | None]:
+    # the probe also sees metadata in the working directory
+    return fingerprint_paths(
+        sorted(
+            file
+            for path in [*paths, os.getcwd()]
+            for pattern in _ENTRY_POINTS_PATTERNS
+            for file in glob.glob(os.path.join(glob.escape(path), pattern))
+        )
+    )
+
+
 @requires_project_root
 @requires_python
 async def list_scripts(
     *, python_path: str | None = None, cwd: Path | None = None
 ) -> list[str]:
+    """List the scripts registered as entry points in the project interpreter.
+
+    The result is persisted per project and reused until the interpreter or the
+    `entry_points.txt` files in its site-packages change.
+    """
     if python_path is None:
         python_path = await get_default_python(cwd)
 
+    project = str(get_project_root(cwd))
+    info = await get_interpreter_info(python_path, cwd)
+    fingerprint = _entry_points_fingerprint(info["site_packages"])
+    entry = load_interpreter_cache().get("scripts", {}).get(project)
+    if entry and entry["python"] == python_path and entry["fingerprint"] == fingerprint:
+        return entry["scripts"]
+
     t = templates.get_template("script/list_scripts.py.jinja")
-    proc = await create_process(
-        python_path,
-        "-W",
-        "ignore",
-        "-c",
-        await t.render_async(),
-        stdout=asyncio.subprocess.PIPE,
-    )
-    stdout, _ = await proc.communicate()
-    return json.loads(stdout.strip())
+    stdout = await run_probe(python_path, await t.render_async())
+    scripts: list[str] = json.loads(stdout.strip())
+
+    if os.path.isabs(python_path):
+
+        def _update(data: dict[str, Any]) -> None:
+            data.setdefault("scripts", {})[project] = {
+                "python": python_path,
+                "fingerprint": fingerprint,
+                "scripts": scripts,
+            }
+
+        update_interpreter_cache(_update)
+    return scripts
 
 
 @requires_project_root
@@ -0,0 +1,108 @@
+import contextlib
+import functools
+import marshal
+import os
+from pathlib import Path
+import secrets
+
+from .data import CACHE_DIR
+from .registry import INDEXED_KEYS, Index, IndexKey, T, RegistryView, record_fields
+
+SNAPSHOT_MAGIC = b"NBCLI-SNAPSHOT"
+SNAPSHOT_VERSION = 2
+SNAPSHOT_ENABLED = os.getenv("NB_CLI_SNAPSHOT", "1").lower() not in {"0", "false"}
+"""Set `NB_CLI_SNAPSHOT=0` to always load module data from JSON."""
+
+_HEADER = SNAPSHOT_MAGIC + SNAPSHOT_VERSION.to_bytes(2, "big")
+
+
+def snapshot_path(module_class: type[T]) -> Path:
+    return CACHE_DIR / f"{module_class.__module_name__}.snapshot"
+
+
+def index_path(module_class: type[T]) -> Path:
+    return CACHE_DIR / f"{module_class.__module_name__}.index"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmpfile = path.with_name(f"{path.name}.{secrets.token_hex(4)}.tmp")
+    try:
+        tmpfile.write_bytes(data)
+        os.replace(tmpfile, path)
+    finally:
+        tmpfile.unlink(missing_ok=True)
+
+
+def dump_snapshot(modules: RegistryView[T]) -> None:
+    """Write validated modules into a columnar binary snapshot.
+
+    The snapshot is written atomically and stays valid as long as it is
+    not older than the JSON cache file. The lookup indexes of `INDEXED_KEYS`
+    are written next to it, bound to the snapshot by a random token.
+    """
+    if not SNAPSHOT_ENABLED:
+        return
+
+    token = secrets.token_hex(8)
+    # each index is marshalled on its own, so that lookups only decode what they use
+    indexes = {key: marshal.dumps(modules.index(key)) for key in INDEXED_KEYS}
+    _write_atomic(
+        index_path(modules.module_class),
+        _HEADER + marshal.dumps((token, indexes)),
+    )
+    _write_atomic(
+        snapshot_path(modules.module_class),
+        _HEADER + marshal.dumps((token, modules.fields, len(modules), modules.columns)),
+    )
+
+
+def _load_indexes(module_class: type[T], token: str) -> dict[IndexKey, bytes]:
+    try:
+        data = index_path(module_class).read_bytes()
+        if data.startswith(_HEADER):
+            index_token, indexes = marshal.loads(data[len(_HEADER) :])
+            if index_token == token:
+                return indexes
+    except Exception:
+        pass
+    return {}  # fallback to build indexes in memory
+
+
+def load_snapshot(module_class: type[T], datafile: Path) -> RegistryView[T] | None:
+    """Load modules lazily from the snapshot, or `None` if it is unusable."""
+    if not SNAPSHOT_ENABLED:
+        return None
+
+    path = snapshot_path(module_class)
+    try:
+        if path.stat().st_mtime_ns < datafile.stat().st_mtime_ns:
+            return None  # JSON cache is updated by someone else
+        data = path.read_bytes()
+        if not data.startswith(_HEADER):
+            return None
+        token, fields, count, columns = marshal.loads(data[len(_HEADER) :])
+    except Exception:
+        return None
+    if (
+        tuple(fields) != record_fields(module_class)
+        or len(columns) != len(fields)
+        or any(len(column) != count for column in columns)
+    ):
+        return None
+    # persisted indexes are only read when a lookup needs them
+    indexes = functools.cache(functools.partial(_load_indexes, module_class, token))
+
+    def _index_source(key: IndexKey) -> Index | None:
+        with contextlib.suppress(Exception):
+            if (data := indexes().get(key)) is not None:
+                return marshal.loads(data)
+        return None
+
+    return RegistryView(module_class, columns, index_source=_index_source)
+
+
+def touch_snapshot(module_class: type[T]) -> None:
+    """Keep the snapshot valid after the JSON cache is revalidated."""
+    path = snapshot_path(module_class)
+    if path.is_file():
+        os.utime(path)
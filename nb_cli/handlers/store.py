@@ -1,76 +1,230 @@
-from asyncio import as_completed, create_task
+from collections.abc import Callable
+import contextlib
 from datetime import datetime, timedelta
 import json
+import os
+from pathlib import Path
+import secrets
 import typing
-from typing import TYPE_CHECKING, Literal, TypeVar, overload
+from typing import TYPE_CHECKING, Any, Literal, TypedDict, TypeVar, overload
 
 import anyio
 import click
 import httpx
+from pydantic import ValidationError
 
 from nb_cli import _, cache
-from nb_cli.compat import model_dump, type_validate_json, type_validate_python
+from nb_cli.completion import dump_package_names
+from nb_cli.compat import model_dump, model_validate, type_validate_json
 from nb_cli.config import Adapter, Driver, Plugin
 from nb_cli.exceptions import LocalCacheExpired, ModuleLoadFailed
 from nb_cli.handlers.data import CACHE_DIR
+from nb_cli.handlers.mirror import get_mirrors, race_mirrors
+from nb_cli.handlers.network import http_stream
+from nb_cli.handlers.registry import MODULE_KEY, RegistryView
+from nb_cli.handlers.snapshot import dump_snapshot, load_snapshot, touch_snapshot
+from nb_cli.profiling import profiled
 
 T = TypeVar("T", Adapter, Plugin, Driver)
 
+
+class ModuleDataBatch(TypedDict, total=False):
+    adapter: RegistryView[Adapter]
+    plugin: RegistryView[Plugin]
+    driver: RegistryView[Driver]
+
+
 try:
     CACHE_DIR.mkdir(parents=True, exist_ok=True)  # ensure cache dir exists
 except Exception:
     click.secho(_("WARNING: Cache directory is unavailable."), fg="yellow")
 
 
-def _compile_module_index(modules: list[T]) -> dict[tuple[str, str], T]:
-    return {(mod.name, mod.module_name): mod for mod in modules}
+class _JSONArrayParser:
+    """Incrementally parse the items of a top-level JSON array."""
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+        self._expect_item = True
+
+    def feed(self, text: str) -> list[Any]:
+        """Feed more text and return the items completed so far."""
+        buffer = self._buffer + text
+        items: list[Any] = []
+        pos = 0
+        while not self._finished:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not self._started:
+                if buffer[pos] != "[":
+                    raise ValueError("Expected a JSON array.")
+                self._started = True
+                pos += 1
+            elif buffer[pos] == "]":
+                self._finished = True
+                pos += 1
+            elif not self._expect_item:
+                if buffer[pos] != ",":
+                    raise ValueError(f"Unexpected character {buffer[pos]!r}.")
+                self._expect_item = True
+                pos += 1
+            else:
+                try:
+                    item, end = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    break  # incomplete item, wait for more data
+                if end >= len(buffer) or not (
+                    buffer[end] in ",]" or buffer[end].isspace()
+                ):
+                    break  # a number may continue in the next chunk
+                items.append(item)
+                self._expect_item = False
+                pos = end
+        self._buffer = buffer[pos:]
+        return items
+
+    def close(self) -> None:
+        if not self._finished or self._buffer.strip():
+            raise ValueError("Incomplete or invalid JSON array.")
+
+
+async def _stream_module_data(
+    resp: httpx.Response, module_class: type[T], cachefile: Path
+) -> tuple[list[T], int, bool]:
+    """Validate module entries as they arrive and write them to `cachefile`.
+
+    Returns:
+        The valid modules, the number of skipped invalid entries and
+        whether the cache file is written.
+    """
+    parser = _JSONArrayParser()
+    result: list[T] = []
+    skipped = 0
+    try:
+        f = await anyio.open_file(cachefile, "w", encoding="utf-8")
+    except OSError:
+        f = None  # caching is optional
+
+    try:
+        if f is not None:
+            await f.write("[")
+        async for chunk in resp.aiter_text():
+            valid_items: list[str] = []
+            for item in parser.feed(chunk):
+                try:
+                    result.append(model_validate(module_class, item))
+                except ValidationError:
+                    skipped += 1
+                    continue
+                valid_items.append(json.dumps(item, ensure_ascii=False))
+            if f is not None and valid_items:
+                await f.write(
+                    ("," if len(result) > len(valid_items) else "")
+                    + ",".join(valid_items)
+                )
+        parser.close()
+        if f is not None:
+            await f.write("]")
+    finally:
+        if f is not None:
+            await f.aclose()
+
+    if skipped and not result:
+        raise ValueError("No valid module found.")
+    return result, skipped, f is not None
+
+
+def _load_cache_validators(module_name: str) -> dict[str, dict[str, str]]:
+    try:
+        return json.loads(
+            (CACHE_DIR / f"{module_name}_validators.json").read_text("utf-8")
+        )
+    except Exception:
+        return {}
+
 
+def _dump_cache_validators(module_name: str, url: str, headers: httpx.Headers) -> None:
+    # validators of other mirrors describe other copies of the data, drop them
+    current = {
+        k: v
+        for k, v in (
+            ("etag", headers.get("etag")),
+            ("last_modified", headers.get("last-modified")),
+        )
+        if v
+    }
+    (CACHE_DIR / f"{module_name}_validators.json").write_text(
+        json.dumps({url: current} if current else {}), encoding="utf-8"
+    )
+
+
+def _update_unpublished_modules(
+    module_class: type[T],
+    newer: RegistryView[T],
+    previous: RegistryView[T] | None,
+) -> None:
+    """Apply the changes between two registry snapshots to the unpublished store.
+
+    Only the modules removed since `previous` are dumped, and the store is
+    only rewritten if it changes.
+    """
+    path = CACHE_DIR / f"{module_class.__module_name__}_unpublished.json"
+    newer_keys = newer.index(MODULE_KEY)
+    unpublished: list[dict[str, Any]] = (
+        json.loads(path.read_text(encoding="utf-8")) if path.is_file() else []
+    )
+    # republished modules are no longer tracked
+    kept = [m for m in unpublished if (m["name"], m["module_name"]) not in newer_keys]
+    known = {(m["name"], m["module_name"]) for m in kept}
+    removed = (
+        []
+        if previous is None
+        else [
+            key
+            for key in previous.index(MODULE_KEY)
+            if key not in newer_keys and key not in known
+        ]
+    )
+    if not removed and len(kept) == len(unpublished) and path.is_file():
+        return
 
-def _calculate_unpublished_modules(
-    newer: list[T], current: list[T], historical_unpublished: list[T]
-) -> list[T]:
-    # NOTE: This function requires calculation.
-    # Working with larger data can be slow, which is harmful to the async runtime.
-    # Consider wrapping in something like to_thread if data size grows:
-    # e.g., result = await asyncio.to_thread(
-    #     get_unpublished_modules, newer, current, historical
-    # )
-    # or result = await anyio.to_process.run_sync(
-    #     get_unpublished_modules
-    # )(newer, current, historical)
-    newer_index = _compile_module_index(newer)
-    current_index = _compile_module_index(current + historical_unpublished)
-    return [current_index[k] for k in set(current_index) - set(newer_index)]
+    added = [] if previous is None else previous.lookup_many(MODULE_KEY, removed)
+    tmpfile = path.with_name(f"{path.name}.{secrets.token_hex(4)}.tmp")
+    try:
+        tmpfile.write_text(
+            json.dumps(kept + [model_dump(x) for x in added], ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmpfile, path)
+    finally:
+        tmpfile.unlink(missing_ok=True)
 
 
-async def dump_unpublished_modules(module_class: type[T], newer: list[T]) -> None:
+async def dump_unpublished_modules(
+    module_class: type[T],
+    newer: RegistryView[T],
+    previous: RegistryView[T] | None = None,
+) -> None:
+    """Track the modules that disappeared from the registry since `previous`."""
     from nb_cli.cli.utils import run_sync  # avoid circular import error
 
-    module_name: str = module_class.__module_name__
+    await run_sync(_update_unpublished_modules)(module_class, newer, previous)
 
-    if (path_current := CACHE_DIR / f"{module_name}.json").is_file():
-        async with await anyio.open_file(path_current, encoding="utf-8") as fcurrent:
-            current = type_validate_json(list[module_class], await fcurrent.read())
-    else:
-        current: list[T] = []
-
-    if (path_historical := CACHE_DIR / f"{module_name}_unpublished.json").is_file():
-        async with await anyio.open_file(
-            path_historical, encoding="utf-8"
-        ) as fhistorical:
-            historical = type_validate_json(
-                list[module_class], await fhistorical.read()
-            )
-    else:
-        historical: list[T] = []
-
-    result = await run_sync(_calculate_unpublished_modules)(newer, current, historical)
-    async with await anyio.open_file(
-        CACHE_DIR / f"{module_name}_unpublished.json", "w", encoding="utf-8"
-    ) as fnew:
-        await fnew.write(
-            json.dumps([model_dump(x) for x in result], ensure_ascii=False)
-        )
+
+def _load_previous_modules(
+    module_type: Literal["adapter", "plugin", "driver"],
+) -> RegistryView[Any] | None:
+    try:
+        previous = load_local_module_data(module_type, allow_expired=True)
+    except ModuleLoadFailed:
+        return None
+    previous.index(MODULE_KEY)  # load it before the index file is replaced
+    return previous
 
 
 if TYPE_CHECKING:
@@ -94,24 +248,29 @@ if TYPE_CHECKING:
     @overload
     async def download_module_data(
         module_type: Literal["adapter"],
-    ) -> list[Adapter]: ...
+    ) -> RegistryView[Adapter]: ...
 
     @overload
-    async def download_module_data(module_type: Literal["plugin"]) -> list[Plugin]: ...
+    async def download_module_data(
+        module_type: Literal["plugin"],
+    ) -> RegistryView[Plugin]: ...
 
     @overload
-    async def download_module_data(module_type: Literal["driver"]) -> list[Driver]: ...
+    async def download_module_data(
+        module_type: Literal["driver"],
+    ) -> RegistryView[Driver]: ...
 
     async def download_module_data(
         module_type: Literal["adapter", "plugin", "driver"],
-    ) -> list[Adapter] | list[Plugin] | list[Driver]: ...
+    ) -> RegistryView[Adapter] | RegistryView[Plugin] | RegistryView[Driver]: ...
 
 else:
 
     @cache(ttl=None)
+    @profiled("download_module_data")
     async def download_module_data(
         module_type: Literal["adapter", "plugin", "driver"],
-    ) -> list[Adapter] | list[Plugin] | list[Driver]:
+    ) -> RegistryView[Adapter] | RegistryView[Plugin] | RegistryView[Driver]:
         if module_type == "adapter":
             module_class = Adapter
         elif module_type == "plugin":
@@ -124,85 +283,130 @@ else:
             )
         module_name: str = module_class.__module_name__
 
-        exceptions: list[Exception] = []
-        urls = [
-            f"https://registry.nonebot.dev/{module_name}.json",
-            f"https://cdn.jsdelivr.net/gh/nonebot/registry@results/{module_name}.json",
-            f"https://cdn.staticaly.com/gh/nonebot/registry@results/{module_name}.json",
-            f"https://jsd.cdn.zzko.cn/gh/nonebot/registry@results/{module_name}.json",
-            f"https://mirror.ghproxy.com/https://raw.githubusercontent.com/nonebot/registry/results/{module_name}.json",
-            f"https://gh-proxy.com/https://raw.githubusercontent.com/nonebot/registry/results/{module_name}.json",
-        ]
-
-        async def _request(url: str) -> httpx.Response:
-            async with httpx.AsyncClient() as client:
-                return await client.get(url)
-
-        tasks = [create_task(_request(url)) for url in urls]
-        for future in as_completed(tasks):
+        # conditional requests are only safe when there is local data to fall back on
+        datafile = CACHE_DIR / f"{module_name}.json"
+        validators = _load_cache_validators(module_name) if datafile.is_file() else {}
+
+        async def _attempt(
+            mirror: str,
+        ) -> tuple[
+            str,
+            httpx.Response,
+            Path | None,
+            RegistryView[Adapter] | RegistryView[Plugin] | RegistryView[Driver],
+        ]:
+            url = mirror.format(module_name=module_name)
+            headers: dict[str, str] = {}
+            if etag := validators.get(url, {}).get("etag"):
+                headers["If-None-Match"] = etag
+            if last_modified := validators.get(url, {}).get("last_modified"):
+                headers["If-Modified-Since"] = last_modified
+            # each racing mirror streams into its own file, the winner replaces cache
+            tmpfile = datafile.with_name(f"{datafile.name}.{secrets.token_hex(4)}.tmp")
             try:
-                resp = await future
-                items = resp.json()
-                result = type_validate_python(list[module_class], items)
-                for task in tasks:
-                    if not task.done():
-                        task.cancel()
-                try:
-                    # attempt to save cache, pass even if failed
-                    async with await anyio.open_file(
-                        CACHE_DIR / f"{module_name}.json", "w", encoding="utf-8"
-                    ) as f:
-                        await f.write(json.dumps(items, ensure_ascii=False))
-                except Exception:
-                    click.secho(
-                        _(
-                            "WARNING: Failed to cache data for module {module_type}."
-                        ).format(module_type=module_type),
-                        fg="yellow",
+                async with http_stream(url, headers=headers) as resp:
+                    if resp.status_code == httpx.codes.NOT_MODIFIED:
+                        # only the mirror of the local data can confirm it
+                        if url not in validators:
+                            raise ValueError(f"Unexpected 304 response from {url}")
+                        return (
+                            url,
+                            resp,
+                            None,
+                            load_local_module_data(module_type, allow_expired=True),
+                        )
+                    resp.raise_for_status()
+                    result, skipped, cached = await _stream_module_data(
+                        resp, module_class, tmpfile
                     )
-                try:
-                    await dump_unpublished_modules(module_class, result)  # type: ignore
-                except Exception:
-                    click.secho(
-                        _(
-                            "WARNING: Failed to update unpublished data for module "
-                            "{module_type}."
-                        ).format(module_type=module_type),
-                        fg="yellow",
-                    )
-                return result  # type: ignore
-            except Exception as e:
-                exceptions.append(e)
+            except BaseException:
+                tmpfile.unlink(missing_ok=True)
+                raise
+            if skipped:
+                click.secho(
+                    _(
+                        "WARNING: Skipped {count} invalid entries of module "
+                        "{module_type}."
+                    ).format(count=skipped, module_type=module_type),
+                    fg="yellow",
+                )
+            return (
+                url,
+                resp,
+                tmpfile if cached else None,
+                RegistryView.from_models(module_class, result),  # pyright: ignore[reportArgumentType]
+            )
 
-        raise ModuleLoadFailed(
-            _("Failed to get {module_type} list.").format(module_type=module_type),
-            exceptions,
-        )
+        try:
+            url, resp, tmpfile, result = await race_mirrors(get_mirrors(), _attempt)
+        except ModuleLoadFailed as e:
+            raise ModuleLoadFailed(
+                _("Failed to get {module_type} list.").format(module_type=module_type),
+                *e.args[1:],
+            ) from e
+
+        if resp.status_code == httpx.codes.NOT_MODIFIED:
+            # local data is still up to date, only renew its freshness
+            os.utime(datafile)
+            touch_snapshot(module_class)
+            return result
+
+        from nb_cli.cli.utils import run_sync  # avoid circular import error
+
+        previous = await run_sync(_load_previous_modules)(module_type)
+        try:
+            # attempt to save cache, pass even if failed
+            if tmpfile is None:
+                raise OSError("Cache file is not written.")
+            os.replace(tmpfile, datafile)
+            _dump_cache_validators(module_name, url, resp.headers)
+            dump_snapshot(result)  # pyright: ignore[reportArgumentType]
+            dump_package_names(module_type, result.column("project_link"))
+        except Exception:
+            if tmpfile is not None:
+                tmpfile.unlink(missing_ok=True)
+            click.secho(
+                _("WARNING: Failed to cache data for module {module_type}.").format(
+                    module_type=module_type
+                ),
+                fg="yellow",
+            )
+        try:
+            await dump_unpublished_modules(module_class, result, previous)  # type: ignore
+        except Exception:
+            click.secho(
+                _(
+                    "WARNING: Failed to update unpublished data for module "
+                    "{module_type}."
+                ).format(module_type=module_type),
+                fg="yellow",
+            )
+        return result
 
 
 @overload
 def load_local_module_data(
     module_type: Literal["adapter"], *, allow_expired: bool = False
-) -> list[Adapter]: ...
+) -> RegistryView[Adapter]: ...
 
 
 @overload
 def load_local_module_data(
     module_type: Literal["plugin"], *, allow_expired: bool = False
-) -> list[Plugin]: ...
+) -> RegistryView[Plugin]: ...
 
 
 @overload
 def load_local_module_data(
     module_type: Literal["driver"], *, allow_expired: bool = False
-) -> list[Driver]: ...
+) -> RegistryView[Driver]: ...
 
 
 def load_local_module_data(
     module_type: Literal["adapter", "plugin", "driver"],
     *,
     allow_expired: bool = False,
-) -> list[Adapter] | list[Plugin] | list[Driver]:
+) -> RegistryView[Adapter] | RegistryView[Plugin] | RegistryView[Driver]:
     if module_type == "adapter":
         module_class = Adapter
     elif module_type == "plugin":
@@ -220,9 +424,16 @@ def load_local_module_data(
         if allow_expired or datetime.now() - datetime.fromtimestamp(
             datafile.stat().st_mtime
         ) < timedelta(hours=12):
+            if (modules := load_snapshot(module_class, datafile)) is None:
+                modules = RegistryView.from_models(
+                    module_class,
+                    type_validate_json(list[module_class], datafile.read_text("utf-8")),
+                )
+                with contextlib.suppress(Exception):  # snapshot is optional
+                    dump_snapshot(modules)
             return typing.cast(
-                list[Adapter] | list[Plugin] | list[Driver],
-                type_validate_json(list[module_class], datafile.read_text("utf-8")),
+                RegistryView[Adapter] | RegistryView[Plugin] | RegistryView[Driver],
+                modules,
             )
     except Exception as exc:
         raise ModuleLoadFailed(
@@ -235,20 +446,23 @@ def load_local_module_data(
 
 
 @overload
-async def load_module_data(module_type: Literal["adapter"]) -> list[Adapter]: ...
+async def load_module_data(
+    module_type: Literal["adapter"],
+) -> RegistryView[Adapter]: ...
 
 
 @overload
-async def load_module_data(module_type: Literal["plugin"]) -> list[Plugin]: ...
+async def load_module_data(module_type: Literal["plugin"]) -> RegistryView[Plugin]: ...
 
 
 @overload
-async def load_module_data(module_type: Literal["driver"]) -> list[Driver]: ...
+async def load_module_data(module_type: Literal["driver"]) -> RegistryView[Driver]: ...
 
 
+@profiled("load_module_data")
 async def load_module_data(
     module_type: Literal["adapter", "plugin", "driver"],
-) -> list[Adapter] | list[Plugin] | list[Driver]:
+) -> RegistryView[Adapter] | RegistryView[Plugin] | RegistryView[Driver]:
     try:
         return load_local_module_data(module_type)
     except ModuleLoadFailed:  # local cache file is missing or broken
@@ -268,3 +482,48 @@ async def load_module_data(
             fg="yellow",
         )
         return res
+
+
+async def load_module_data_batch(
+    *module_types: Literal["adapter", "plugin", "driver"],
+    refresh: bool = False,
+    callback: Callable[[str, Exception | None], Any] | None = None,
+) -> ModuleDataBatch:
+    """Load data of several module types concurrently.
+
+    Args:
+        module_types: The module types to load.
+        refresh: Whether to download the latest data instead of using local cache.
+        callback: Called with the module type and the exception (if any)
+            once loading of each module type finishes.
+
+    Raises:
+        ModuleLoadFailed: If any of the module types failed to load.
+    """
+    result = ModuleDataBatch()
+    exceptions: dict[str, Exception] = {}
+
+    async def _load(module_type: Literal["adapter", "plugin", "driver"]) -> None:
+        try:
+            result[module_type] = (
+                await download_module_data(module_type)
+                if refresh
+                else await load_module_data(module_type)
+            )
+        except Exception as e:
+            exceptions[module_type] = e
+        if callback is not None:
+            callback(module_type, exceptions.get(module_type))
+
+    async with anyio.create_task_group() as tg:
+        for module_type in dict.fromkeys(module_types):
+            tg.start_soon(_load, module_type)
+
+    if exceptions:
+        raise ModuleLoadFailed(
+            _("Failed to get {module_type} list.").format(
+                module_type=", ".join(exceptions)
+            ),
+            exceptions,
+        )
+    return result
@@ -1,7 +1,5 @@
 from pathlib import Path
 
-import virtualenv
-
 from nb_cli.config import ConfigManager
 
 from .meta import get_default_python, requires_python
@@ -18,6 +16,8 @@ async def create_virtualenv(
     *,
     python_path: str | None = None,
 ):
+    import virtualenv
+
     if python_path is None:
         python_path = await get_default_python()
 
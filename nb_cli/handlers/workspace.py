@@ -0,0 +1,99 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Generic, TypeVar
+
+import tomlkit
+
+from nb_cli import _
+from nb_cli.config.parser import CONFIG_FILE, CONFIG_FILE_ENCODING
+from nb_cli.exceptions import ProjectNotFoundError
+
+WORKSPACE_FILE = "nb-workspace.toml"
+"""Workspace file listing project globs in `workspace.projects`."""
+DEFAULT_JOBS = 4
+
+R = TypeVar("R")
+
+
+@dataclass
+class ProjectResult(Generic[R]):
+    project: Path
+    result: R | None
+    error: BaseException | None
+
+
+def find_workspace_file(cwd: Path) -> Path | None:
+    """Find the workspace file in `cwd` or its parents."""
+    cwd = cwd.resolve()
+    for directory in (cwd, *cwd.parents):
+        if (file := directory / WORKSPACE_FILE).is_file():
+            return file
+    return None
+
+
+def load_workspace_file(file: Path) -> list[str]:
+    """Get the project globs of a workspace file, relative to its directory.
+
+    ```toml title="nb-workspace.toml"
+    [workspace]
+    projects = ["bots/*", "standalone-bot"]
+    ```
+    """
+    data = tomlkit.parse(file.read_text(encoding=CONFIG_FILE_ENCODING))
+    patterns = data.get("workspace", {}).get("projects", [])
+    if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+        raise ValueError(
+            _(
+                "Invalid workspace file {file}: projects must be a list of globs."
+            ).format(file=file)
+        )
+    return [str(file.parent / p) for p in patterns]
+
+
+def discover_projects(patterns: Iterable[str], base: Path) -> list[Path]:
+    """Expand globs into project roots, in the order of the globs.
+
+    Relative globs are resolved against `base`. Only directories with a
+    config file are projects.
+
+    Raises:
+        ProjectNotFoundError: If no project is found.
+    """
+    projects: dict[Path, None] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_absolute():
+            anchor, pattern = Path(path.anchor), str(path.relative_to(path.anchor))
+        else:
+            anchor = base
+        matches = anchor.glob(pattern) if pattern else [anchor]
+        for match in sorted(matches):
+            if match.joinpath(CONFIG_FILE).is_file():
+                projects.setdefault(match.resolve(), None)
+    if not projects:
+        raise ProjectNotFoundError(_("No project found in workspace."))
+    return list(projects)
+
+
+async def run_in_projects(
+    projects: Sequence[Path],
+    func: Callable[[Path], Awaitable[R]],
+    *,
+    jobs: int = DEFAULT_JOBS,
+) -> list[ProjectResult[R]]:
+    """Run `func` for each project with at most `jobs` of them at a time.
+
+    Errors are collected per project instead of cancelling the others.
+    """
+    semaphore = asyncio.Semaphore(max(jobs, 1))
+
+    async def _run(project: Path) -> ProjectResult[R]:
+        async with semaphore:
+            try:
+                return ProjectResult(project, await func(project), None)
+            except Exception as e:
+                return ProjectResult(project, None, e)
+
+    return list(await asyncio.gather(*(_run(p) for p in projects)))
@@ -0,0 +1,172 @@
+"""Lightweight timing spans of the CLI phases.
+
+Spans are always recorded, since there are only a few of them per run, and
+are reported when `nb --profile` or `nb --profile-trace FILE` is given.
+Extensions registered in the `nb` entry point group may add their own spans:
+
+```python
+from nb_cli.profiling import profiled, span
+
+@profiled("my_extension.load")
+def load(): ...
+
+with span("my_extension.step", detail="value"):
+    ...
+```
+"""
+
+from collections.abc import Callable, Iterator
+import contextlib
+from contextlib import contextmanager
+from functools import wraps
+import inspect
+import json
+import os
+from pathlib import Path
+import sys
+import threading
+import time
+from typing import Any, NamedTuple, TypeVar, cast
+
+from nb_cli.i18n import _
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_ORIGIN = time.perf_counter_ns()
+
+
+class Span(NamedTuple):
+    name: str
+    start: int
+    """Start time in nanoseconds since the CLI was imported."""
+    duration: int
+    """Duration in nanoseconds."""
+    track: int
+    """Task or thread the span ran in."""
+    args: dict[str, Any]
+
+
+_spans: list[Span] = []
+_report: bool = False
+_trace_file: Path | None = None
+
+
+def _track() -> int:
+    # concurrent tasks get their own tracks, so that their spans stay nested.
+    # asyncio is slow to import, and there are no tasks before it is imported
+    task = None
+    if (asyncio := sys.modules.get("asyncio")) is not None:
+        with contextlib.suppress(RuntimeError):
+            task = asyncio.current_task()
+    return id(task) if task is not None else threading.get_ident()
+
+
+def record(name: str, start: int, end: int, /, **args: Any) -> None:
+    """Record a finished span with `time.perf_counter_ns` timestamps."""
+    _spans.append(Span(name, start - _ORIGIN, end - start, _track(), args))
+
+
+@contextmanager
+def span(name: str, /, **args: Any) -> Iterator[None]:
+    """Time the enclosed block as span `name`, with optional trace arguments."""
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        record(name, start, time.perf_counter_ns(), **args)
+
+
+def profiled(name: str) -> Callable[[F], F]:
+    """Time every call of a function, which may be a coroutine function."""
+
+    def decorator(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return cast(F, async_wrapper)
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+def enable_report() -> None:
+    """Print the breakdown of spans when the CLI exits."""
+    global _report
+
+    _report = True
+
+
+def enable_trace(path: Path) -> None:
+    """Write spans as Chrome trace events to `path` when the CLI exits."""
+    global _trace_file
+
+    _trace_file = path
+
+
+def get_spans() -> list[Span]:
+    return list(_spans)
+
+
+def format_breakdown(spans: list[Span]) -> str:
+    """Format the total and maximum time spent in each span name."""
+    stats: dict[str, list[int]] = {}
+    for s in spans:
+        stat = stats.setdefault(s.name, [0, 0, 0])
+        stat[0] += 1
+        stat[1] += s.duration
+        stat[2] = max(stat[2], s.duration)
+
+    width = max((len(name) for name in stats), default=4)
+    lines = [
+        f"{_('span'):<{width}}  {_('calls'):>5}  {_('total ms'):>10}  {_('max ms'):>10}"
+    ]
+    for name, (calls, total, longest) in sorted(
+        stats.items(), key=lambda item: item[1][1], reverse=True
+    ):
+        lines.append(
+            f"{name:<{width}}  {calls:>5}  {total / 1e6:>10.2f}  {longest / 1e6:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def dump_trace(path: Path, spans: list[Span]) -> None:
+    """Write spans in the Chrome trace event format (`chrome://tracing`)."""
+    pid = os.getpid()
+    events = [
+        {
+            "name": s.name,
+            "cat": "nb",
+            "ph": "X",
+            "ts": s.start / 1e3,
+            "dur": s.duration / 1e3,
+            "pid": pid,
+            "tid": s.track,
+            "args": {k: str(v) for k, v in s.args.items()},
+        }
+        for s in spans
+    ]
+    path.write_text(json.dumps({"traceEvents": events}), encoding="utf-8")
+
+
+def report() -> None:
+    """Output the recorded spans as requested by the command line options."""
+    if not (_report or _trace_file):
+        return
+
+    import click
+
+    spans = get_spans()
+    if _report:
+        click.echo(format_breakdown(spans), err=True)
+    if _trace_file is not None:
+        dump_trace(_trace_file, spans)
@@ -220,11 +220,12 @@ class CardPopup(ModalScreen, Generic[T_module]):
         )
         await con.attach_process(proc)
         if proc.returncode == 0:
-            GLOBAL_CONFIG.add_dependency(self.data)
-            if isinstance(self.data, Adapter):
-                GLOBAL_CONFIG.add_adapter(self.data)
-            elif isinstance(self.data, Plugin):
-                GLOBAL_CONFIG.add_plugin(self.data)
+            with GLOBAL_CONFIG.transaction():
+                GLOBAL_CONFIG.add_dependency(self.data)
+                if isinstance(self.data, Adapter):
+                    GLOBAL_CONFIG.add_adapter(self.data)
+                elif isinstance(self.data, Plugin):
+                    GLOBAL_CONFIG.add_plugin(self.data)
             await self.app.pop_screen()
             self.notify(
                 _('Successfully installed "{name}".').format(name=self.data.name)
@@ -260,7 +261,7 @@ class Card(Static, Generic[T_module]):
             if self.data
             else ""
         )
-        content = ("[$text]{desc}[/]\n" "{tags}\n" "[gray]{author}[/]").format(
+        content = ("[$text]{desc}[/]\n{tags}\n[gray]{author}[/]").format(
             desc=(_("Initializing...") if self.data is None else markup.escape(desc)),
             tags="" if self.data is None else _create_tag(*self.data.tags),
             author=(
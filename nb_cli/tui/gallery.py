@@ -1,3 +1,4 @@
+from collections.abc import Sequence
 from functools import partial
 from typing import ClassVar, Generic, TypeVar
 
@@ -9,7 +10,7 @@ from textual.widget import Widget
 from textual.widgets import Footer, Header, Input
 
 from nb_cli import _
-from nb_cli.cli.utils import advanced_search_filter
+from nb_cli.cli.utils import advanced_search_mask
 from nb_cli.config.model import Adapter, Driver, Plugin
 from nb_cli.tui.card import Card
 from nb_cli.tui.console import LogConsole
@@ -46,7 +47,7 @@ class Gallery(App, Generic[T_module]):
     }
     """
 
-    datasource: var[list[T_module]] = var(list, init=False)
+    datasource: var[Sequence[T_module]] = var(list, init=False)
     cards: var[list[Card[T_module]]] = var(list)
     query_open: var[bool] = var(False)
     query_filter: var[str] = var("", always_update=True)
@@ -99,11 +100,11 @@ class Gallery(App, Generic[T_module]):
             input_.focus()
 
     def watch_query_filter(self, _: str, new_qf: str):
-        for x in self.cards:
-            if x.data is None:
-                x.display = False
-                continue
-            x.display = advanced_search_filter(new_qf, x.data)
+        # cards are mounted in the order of datasource
+        for x, matched in zip(
+            self.cards, advanced_search_mask(new_qf, self.datasource)
+        ):
+            x.display = x.data is not None and matched
 
     def action_toggle_dark(self) -> None:
         """An action to toggle dark mode."""
@@ -0,0 +1,52 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = (
+    "cookiecutter",
+    "httpx",
+    "jinja2",
+    "nonebot",
+    "tomlkit",
+    "virtualenv",
+    "watchfiles",
+)
+"""Dependencies only imported by the commands that need them."""
+
+
+def _imported_modules(source: str) -> set[str]:
+    # a fresh interpreter, so that modules imported by the tests do not leak in
+    source += "\nimport json, sys\nprint(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", source], capture_output=True, text=True, check=True
+    )
+    modules = json.loads(result.stdout.splitlines()[-1])
+    return {name.partition(".")[0] for name in modules}
+
+
+@pytest.fixture(scope="module")
+def cli_imports() -> set[str]:
+    return _imported_modules("import nb_cli.cli")
+
+
+@pytest.fixture(scope="module")
+def version_imports() -> set[str]:
+    return _imported_modules(
+        "from nb_cli.__main__ import main\n"
+        "try:\n"
+        "    main(['--version'])\n"
+        "except SystemExit:\n"
+        "    pass"
+    )
+
+
+@pytest.mark.parametrize("module", [*HEAVY_MODULES, "anyio"])
+def test_cli_does_not_import(cli_imports: set[str], module: str):
+    assert module not in cli_imports
+
+
+@pytest.mark.parametrize("module", HEAVY_MODULES)
+def test_version_does_not_import(version_imports: set[str], module: str):
+    assert module not in version_imports